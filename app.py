@@ -1,16 +1,26 @@
 import streamlit as st
 import pandas as pd
-import tempfile
 import os
 import logging
-import pygwalker as pyg
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import mean_squared_error, r2_score
+import contextlib
+import multiprocessing
+import time
+import secrets
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from cache import LRUCache, WorkbookCache, content_hash, dataset_cache_key, sheet_cache_key
+from insights import STATS_CACHE_DATASETS, StatsCache
+from chunked import ChunkedStats, sheet_stats
+from sampling import DEFAULT_SAMPLE_ROWS, approximate_describe, correlation_interval, sample_rows
+from visualization import AGGREGATIONS, prepare_visualization_frame
+from store import DatasetStore
+from profiling import PipelineProfiler, cprofile_run, profiled
+from modeling import (DEFAULT_EPOCHS, INCREMENTAL_MODELS, MODEL_CHOICES, SEARCH_MODES,
+                      cross_validate_candidates, export_model, import_model, model_cache_key, score_frame,
+                      search_candidates, summarize_folds, train_and_evaluate, train_incremental)
+from loaders import (combine_frames, iter_excel_chunks, list_sheets, load_sheets, open_upload, optimize_dtypes,
+                     read_excel_streaming, spool_to_path)
+from jobs import JobManager, run_in_process
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,6 +28,46 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Set Streamlit page configuration to wide layout
 st.set_page_config(layout="wide")
 
+# Parsed workbook cache: in-memory budget and optional Parquet spill directory
+CACHE_MAX_BYTES = int(os.environ.get("EXCEL_CACHE_MAX_MB", "1024")) * 1024 * 1024
+CACHE_SPILL_DIR = os.environ.get("EXCEL_CACHE_DIR")
+
+# Uploads at least this large are read with the streaming (read-only) parser in "auto" mode
+STREAMING_THRESHOLD_BYTES = int(os.environ.get("EXCEL_STREAMING_THRESHOLD_MB", "25")) * 1024 * 1024
+
+# Uploads above this size are parsed from a spooled temp file instead of the upload buffer
+SPOOL_THRESHOLD_BYTES = int(os.environ.get("EXCEL_SPOOL_THRESHOLD_MB", "256")) * 1024 * 1024
+
+# Frames with more rows than this open in sampled "fast mode" by default
+FAST_MODE_ROWS = int(os.environ.get("EXCEL_FAST_MODE_ROWS", "1000000"))
+
+# Rows serialized into the Pygwalker component and memory kept for rendered explorer HTML
+VIZ_ROW_BUDGET = int(os.environ.get("EXCEL_VIZ_ROW_BUDGET", "50000"))
+VIZ_CACHE_MAX_BYTES = int(os.environ.get("EXCEL_VIZ_CACHE_MB", "256")) * 1024 * 1024
+
+# Columnar dataset store shared by all sessions; set to an empty string to disable
+STORE_DIR = os.environ.get("EXCEL_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "excel-analysis", "datasets"))
+STORE_MAX_BYTES = int(os.environ.get("EXCEL_STORE_MAX_MB", "10240")) * 1024 * 1024
+
+# Worker processes used to parse several sheets or files in parallel
+LOAD_WORKERS = int(os.environ.get("EXCEL_LOAD_WORKERS", os.cpu_count() or 1))
+
+# Key signing exported models; imports are refused unless signed with it. Without
+# it a random key is used, so models can be re-imported until the server restarts.
+MODEL_SECRET = os.environ.get("EXCEL_MODEL_SECRET")
+
+# Memory kept for fitted models and their exported files, shared by all sessions
+MODEL_CACHE_MAX_BYTES = int(os.environ.get("EXCEL_MODEL_CACHE_MB", "512")) * 1024 * 1024
+
+# Rows per chunk in out-of-core mode, which never holds more than one chunk of the data
+OUT_OF_CORE_CHUNK_ROWS = int(os.environ.get("EXCEL_OUT_OF_CORE_CHUNK_ROWS", "50000"))
+
+# Threads running background insights and model training, the cap on queued or
+# running jobs per browser session, and how often the jobs panel polls them
+JOB_WORKERS = int(os.environ.get("EXCEL_JOB_WORKERS", "4"))
+MAX_JOBS_PER_SESSION = int(os.environ.get("EXCEL_MAX_JOBS_PER_SESSION", "2"))
+JOB_POLL_SECONDS = float(os.environ.get("EXCEL_JOB_POLL_SECONDS", "2"))
+
 # Translations dictionary
 translations = {
     "en": {
@@ -28,15 +78,15 @@ translations = {
         "instruction_3": "3. **Select Columns for Analysis**: Choose the columns you want to use for analysis from the uploaded Excel file. Use the multiselect dropdown to select multiple columns.",
         "instruction_4": "4. **Generate Insights**: Click on the \"Generate Insights\" button to view descriptive statistics and other insights from the data. This includes basic statistics and a correlation matrix for numeric columns.",
         "instruction_5": "5. **Visualize Data**: Below the insights, use Pygwalker to create interactive visualizations. These visualizations are highly customizable and allow you to explore the data in depth.",
-        "instruction_6": "6. **Train a Machine Learning Model**: Select features and a target column to train a simple linear regression or decision tree regression model.",
+        "instruction_6": "6. **Train a Machine Learning Model**: Select features and a target column to train a linear regression, decision tree or SGD (stochastic gradient descent) regression model.",
         "ml_instruction": """
         ### What does the Machine Learning model do?
 
-        The machine learning model implemented in this tool is a simple linear regression or decision tree regression model. Here’s what it does:
+        The machine learning model implemented in this tool is a linear regression, decision tree or SGD (stochastic gradient descent) regression model. Here’s what it does:
 
         1. **Feature Selection**: Choose one or more columns from your dataset to use as features (independent variables) for the model.
         2. **Target Selection**: Choose one column from your dataset to use as the target (dependent variable) for the model.
-        3. **Train the Model**: The tool splits the data into training and testing sets, trains a linear regression or decision tree regression model on the training data, and evaluates it on the testing data.
+        3. **Train the Model**: The tool splits the data into training and testing sets, trains the chosen model on the training data, and evaluates it on the testing data.
         4. **Model Performance**: The tool provides the Mean Squared Error (MSE) and the R² Score to evaluate the model's performance.
         """,
         "insights_explanation": """
@@ -74,7 +124,87 @@ translations = {
         **Mean Squared Error (MSE)**: This is the average of the squared differences between the actual and predicted values. A lower MSE indicates a better fit.
 
         **R² Score**: This score represents the proportion of the variance in the dependent variable that is predictable from the independent variables. An R² score close to 1 indicates a good fit.
-        """
+        """,
+        "cache_hit": "Loaded from cache, the workbook was not parsed again.",
+        "ingestion_mode": "Ingestion mode",
+        "ingestion_auto": "Automatic (stream large files)",
+        "ingestion_standard": "Standard",
+        "ingestion_streaming": "Streaming (read-only, low memory)",
+        "streaming_progress": "{rows:,} rows read ({rate:,} rows/s)",
+        "select_sheets": "Select sheets to load",
+        "sheet_load_times": "Sheet load times",
+        "memory_report": "Memory: {before} before type optimization, {after} after ({ratio:.1f}x smaller)",
+        "column_types": "Column types and memory",
+        "fast_mode": "Fast mode (sampled statistics)",
+        "sample_size": "Sample size (rows)",
+        "stratify_by": "Stratify sample by",
+        "stratify_none": "No stratification",
+        "fast_mode_caption": "Approximate results from a sample of {rows:,} of {total:,} rows, with {confidence:.0%} confidence intervals.",
+        "confidence_intervals": "Confidence intervals:",
+        "exact_refresh": "Compute exact statistics on all rows",
+        "viz_settings": "Visualization data settings",
+        "viz_row_budget": "Maximum rows sent to the explorer",
+        "viz_group_by": "Pre-aggregate by columns (optional)",
+        "viz_aggregation": "Aggregation",
+        "viz_downsampled": "Showing a random sample of {rows:,} of {total:,} rows.",
+        "ml_max_depth": "Maximum tree depth (0 = unlimited)",
+        "ml_min_samples_split": "Minimum samples to split a node",
+        "ml_export_model": "Download trained model",
+        "ml_import_model": "Score this data with a previously exported model",
+        "ml_import_warning": "Only model files exported by this server can be imported; other files are rejected before they are opened.",
+        "ml_import_error": "The model could not be applied",
+        "ml_imported_model": "Predictions from the imported {model} model for '{target}':",
+        "ml_download_predictions": "Download predictions (CSV)",
+        "ml_prepare_predictions": "Prepare predictions for download (CSV)",
+        "ml_evaluation": "Evaluation",
+        "ml_evaluation_split": "Train/test split",
+        "ml_evaluation_cv": "Cross-validation",
+        "ml_evaluation_grid": "Grid search",
+        "ml_evaluation_random": "Random search",
+        "ml_folds": "Number of folds",
+        "ml_n_jobs": "Parallel jobs (-1 = all cores)",
+        "ml_n_iter": "Random search candidates",
+        "ml_patience": "Early stopping: candidates without improvement (0 = off)",
+        "ml_search_progress": "{done} of {total} folds finished",
+        "ml_fold_results": "Per-fold scores and timings",
+        "ml_search_summary": "Candidates ranked by mean R² across folds:",
+        "ml_best_params": "Best hyperparameters: {params}",
+        "stored_datasets": "Reopen a saved dataset",
+        "stored_datasets_none": "None (upload a file)",
+        "store_hit": "Opened from the local dataset store, the workbook was not parsed again.",
+        "perf_panel": "Performance",
+        "perf_no_stages": "No pipeline stages ran in this interaction.",
+        "perf_download_json": "Download stage timings (JSON)",
+        "perf_trace_memory": "Trace peak memory per stage (slower)",
+        "perf_memory_caption": "Peak memory is measured for the whole server process, so stages running at the same time in other sessions or background jobs add to each other's figures.",
+        "perf_profile_next": "Profile the next interaction with cProfile",
+        "perf_download_pstats": "Download cProfile statistics",
+        "section": "Section",
+        "section_insights": "Insights",
+        "section_visualization": "Interactive Visualization",
+        "section_ml": "Machine Learning",
+        "run_in_background": "Run insights and training in the background",
+        "job_submitted": "Started background job #{id}. You can keep exploring; results appear here when it finishes.",
+        "job_already_running": "This computation is already running in the background.",
+        "job_limit": "You already have {limit} background jobs running. Wait for one to finish or cancel it.",
+        "job_result_caption": "Result of the last background run for this selection:",
+        "jobs_panel": "Background jobs",
+        "jobs_none": "No background jobs in this session.",
+        "job_status_queued": "queued",
+        "job_status_running": "running",
+        "job_status_done": "done",
+        "job_status_failed": "failed",
+        "job_status_cancelled": "cancelled",
+        "job_cancel": "Cancel",
+        "job_refresh": "Refresh",
+        "ingestion_out_of_core": "Out-of-core (chunked, for data larger than memory)",
+        "out_of_core_caption": "Out-of-core mode: the data is processed {rows:,} rows at a time and never loaded as a whole. Statistics are exact except for the percentiles, which are estimated from a sample on very large data. The interactive visualization is not available in this mode.",
+        "out_of_core_ml_caption": "Models are trained incrementally with {model}, one chunk at a time.",
+        "ml_epochs": "Passes over the data (epochs)",
+        "ml_alpha": "Regularization strength (alpha)",
+        "ml_penalty": "Penalty",
+        "stored_datasets_delete": "Delete this saved dataset",
+        "store_save_failed": "This dataset could not be saved for reopening: columns that mix numbers and text, or duplicate column names, cannot be stored.",
     },
     "ar": {
         "title": "أداة تحليل ملفات Excel",
@@ -84,15 +214,15 @@ translations = {
         "instruction_3": "3. **اختر الأعمدة للتحليل**: اختر الأعمدة التي تريد استخدامها للتحليل من ملف Excel الذي تم تحميله. استخدم القائمة المنسدلة المتعددة لتحديد أعمدة متعددة.",
         "instruction_4": "4. **توليد الإحصاءات**: انقر فوق الزر \"توليد الإحصاءات\" لعرض الإحصاءات الوصفية والرؤى الأخرى من البيانات. يتضمن ذلك الإحصاءات الأساسية ومصفوفة الارتباط للأعمدة الرقمية.",
         "instruction_5": "5. **تصور البيانات**: أسفل الإحصاءات، استخدم Pygwalker لإنشاء تصورات تفاعلية. هذه التصورات قابلة للتخصيص بدرجة كبيرة وتتيح لك استكشاف البيانات بعمق.",
-        "instruction_6": "6. **تدريب نموذج التعلم الآلي**: اختر الميزات وعمود الهدف لتدريب نموذج الانحدار الخطي البسيط أو نموذج شجرة القرار.",
+        "instruction_6": "6. **تدريب نموذج التعلم الآلي**: اختر الميزات وعمود الهدف لتدريب نموذج انحدار خطي أو نموذج شجرة القرار أو نموذج انحدار SGD (الانحدار التدرجي العشوائي).",
         "ml_instruction": """
         ### ماذا يفعل نموذج التعلم الآلي؟
 
-        النموذج المطبق في هذه الأداة هو نموذج انحدار خطي بسيط أو نموذج شجرة القرار. إليك ما يفعله:
+        النموذج المطبق في هذه الأداة هو نموذج انحدار خطي أو نموذج شجرة القرار أو نموذج انحدار SGD (الانحدار التدرجي العشوائي). إليك ما يفعله:
 
         1. **اختيار الميزات**: اختر عمودًا أو أكثر من بياناتك لاستخدامها كميزات (متغيرات مستقلة) للنموذج.
         2. **اختيار الهدف**: اختر عمودًا واحدًا من بياناتك لاستخدامه كهدف (متغير تابع) للنموذج.
-        3. **تدريب النموذج**: تقوم الأداة بتقسيم البيانات إلى مجموعات تدريب واختبار، وتدريب نموذج الانحدار الخطي أو نموذج شجرة القرار على بيانات التدريب، وتقييمه على بيانات الاختبار.
+        3. **تدريب النموذج**: تقوم الأداة بتقسيم البيانات إلى مجموعات تدريب واختبار، وتدريب النموذج المختار على بيانات التدريب، وتقييمه على بيانات الاختبار.
         4. **أداء النموذج**: توفر الأداة متوسط ​​الخطأ التربيعي (MSE) ودرجة R² لتقييم أداء النموذج.
         """,
         "insights_explanation": """
@@ -130,7 +260,87 @@ translations = {
         **متوسط ​​الخطأ التربيعي (MSE)**: هذا هو متوسط ​​الفروق المربعة بين القيم الفعلية والقيم المتوقعة. يشير انخفاض MSE إلى مطابقة أفضل.
 
         **درجة R²**: يمثل هذا الدرجة نسبة التباين في المتغير التابع التي يمكن التنبؤ بها من المتغيرات المستقلة. يشير اقتراب درجة R² من 1 إلى مطابقة جيدة.
-        """
+        """,
+        "cache_hit": "تم التحميل من الذاكرة المؤقتة، ولم تتم إعادة تحليل المصنف.",
+        "ingestion_mode": "وضع قراءة الملف",
+        "ingestion_auto": "تلقائي (قراءة الملفات الكبيرة تدفقيًا)",
+        "ingestion_standard": "عادي",
+        "ingestion_streaming": "تدفقي (قراءة فقط، ذاكرة منخفضة)",
+        "streaming_progress": "تمت قراءة {rows:,} صف ({rate:,} صف/ث)",
+        "select_sheets": "اختر الأوراق المراد تحميلها",
+        "sheet_load_times": "أوقات تحميل الأوراق",
+        "memory_report": "الذاكرة: {before} قبل تحسين الأنواع، {after} بعده (أصغر بمقدار {ratio:.1f} مرة)",
+        "column_types": "أنواع الأعمدة والذاكرة",
+        "fast_mode": "الوضع السريع (إحصاءات من عينة)",
+        "sample_size": "حجم العينة (صفوف)",
+        "stratify_by": "تقسيم العينة حسب",
+        "stratify_none": "بدون تقسيم",
+        "fast_mode_caption": "نتائج تقريبية من عينة من {rows:,} من أصل {total:,} صف، مع فترات ثقة {confidence:.0%}.",
+        "confidence_intervals": "فترات الثقة:",
+        "exact_refresh": "حساب الإحصاءات الدقيقة على جميع الصفوف",
+        "viz_settings": "إعدادات بيانات التصور",
+        "viz_row_budget": "الحد الأقصى للصفوف المرسلة إلى المستكشف",
+        "viz_group_by": "التجميع المسبق حسب الأعمدة (اختياري)",
+        "viz_aggregation": "طريقة التجميع",
+        "viz_downsampled": "عرض عينة عشوائية من {rows:,} من أصل {total:,} صف.",
+        "ml_max_depth": "أقصى عمق للشجرة (0 = غير محدود)",
+        "ml_min_samples_split": "الحد الأدنى للعينات لتقسيم العقدة",
+        "ml_export_model": "تنزيل النموذج المدرب",
+        "ml_import_model": "تقييم هذه البيانات بنموذج تم تصديره سابقًا",
+        "ml_import_warning": "يمكن استيراد ملفات النماذج التي صدّرها هذا الخادم فقط؛ يتم رفض الملفات الأخرى قبل فتحها.",
+        "ml_import_error": "تعذر تطبيق النموذج",
+        "ml_imported_model": "تنبؤات نموذج {model} المستورد لـ '{target}':",
+        "ml_download_predictions": "تنزيل التنبؤات (CSV)",
+        "ml_prepare_predictions": "تجهيز التنبؤات للتنزيل (CSV)",
+        "ml_evaluation": "طريقة التقييم",
+        "ml_evaluation_split": "تقسيم تدريب/اختبار",
+        "ml_evaluation_cv": "التحقق المتقاطع",
+        "ml_evaluation_grid": "البحث الشبكي",
+        "ml_evaluation_random": "البحث العشوائي",
+        "ml_folds": "عدد الطيات",
+        "ml_n_jobs": "المهام المتوازية (-1 = جميع الأنوية)",
+        "ml_n_iter": "عدد المرشحين في البحث العشوائي",
+        "ml_patience": "الإيقاف المبكر: عدد المرشحين دون تحسن (0 = معطل)",
+        "ml_search_progress": "اكتملت {done} من {total} طيات",
+        "ml_fold_results": "النتائج والأوقات لكل طية",
+        "ml_search_summary": "المرشحون مرتبون حسب متوسط R² عبر الطيات:",
+        "ml_best_params": "أفضل المعاملات: {params}",
+        "stored_datasets": "إعادة فتح مجموعة بيانات محفوظة",
+        "stored_datasets_none": "لا شيء (تحميل ملف)",
+        "store_hit": "تم الفتح من مخزن البيانات المحلي، ولم تتم إعادة تحليل المصنف.",
+        "perf_panel": "الأداء",
+        "perf_no_stages": "لم يتم تنفيذ أي مرحلة في هذا التفاعل.",
+        "perf_download_json": "تنزيل أوقات المراحل (JSON)",
+        "perf_trace_memory": "تتبع ذروة الذاكرة لكل مرحلة (أبطأ)",
+        "perf_memory_caption": "تُقاس ذروة الذاكرة لعملية الخادم بأكملها، لذا فإن المراحل التي تعمل في الوقت نفسه في جلسات أخرى أو مهام في الخلفية تضاف إلى أرقام بعضها البعض.",
+        "perf_profile_next": "تحليل التفاعل التالي باستخدام cProfile",
+        "perf_download_pstats": "تنزيل إحصاءات cProfile",
+        "section": "القسم",
+        "section_insights": "الإحصاءات",
+        "section_visualization": "التصور التفاعلي",
+        "section_ml": "التعلم الآلي",
+        "run_in_background": "تشغيل الرؤى والتدريب في الخلفية",
+        "job_submitted": "بدأت المهمة الخلفية رقم {id}. يمكنك متابعة الاستكشاف، وستظهر النتائج هنا عند انتهائها.",
+        "job_already_running": "هذه العملية قيد التشغيل بالفعل في الخلفية.",
+        "job_limit": "لديك بالفعل {limit} مهام خلفية قيد التشغيل. انتظر انتهاء إحداها أو ألغها.",
+        "job_result_caption": "نتيجة آخر تشغيل في الخلفية لهذا الاختيار:",
+        "jobs_panel": "المهام الخلفية",
+        "jobs_none": "لا توجد مهام خلفية في هذه الجلسة.",
+        "job_status_queued": "في الانتظار",
+        "job_status_running": "قيد التشغيل",
+        "job_status_done": "مكتملة",
+        "job_status_failed": "فشلت",
+        "job_status_cancelled": "ملغاة",
+        "job_cancel": "إلغاء",
+        "job_refresh": "تحديث",
+        "ingestion_out_of_core": "خارج الذاكرة (على دفعات، للبيانات الأكبر من الذاكرة)",
+        "out_of_core_caption": "وضع خارج الذاكرة: تتم معالجة البيانات {rows:,} صفًا في كل مرة ولا يتم تحميلها كاملة أبدًا. الإحصاءات دقيقة باستثناء النسب المئوية التي تُقدَّر من عينة في البيانات الكبيرة جدًا. التصور التفاعلي غير متاح في هذا الوضع.",
+        "out_of_core_ml_caption": "يتم تدريب النماذج تدريجيًا باستخدام {model}، دفعة تلو الأخرى.",
+        "ml_epochs": "عدد المرات على البيانات (الحقب)",
+        "ml_alpha": "قوة التنظيم (alpha)",
+        "ml_penalty": "العقوبة",
+        "stored_datasets_delete": "حذف مجموعة البيانات المحفوظة هذه",
+        "store_save_failed": "تعذر حفظ مجموعة البيانات هذه لإعادة فتحها: لا يمكن تخزين الأعمدة التي تخلط الأرقام بالنصوص أو أسماء الأعمدة المكررة.",
     },
     "fr": {
         "title": "Outil d'Analyse de Fichier Excel",
@@ -140,15 +350,15 @@ translations = {
         "instruction_3": "3. **Sélectionner les Colonnes pour l'Analyse**: Choisissez les colonnes que vous souhaitez utiliser pour l'analyse à partir du fichier Excel téléchargé. Utilisez la liste déroulante multisélection pour sélectionner plusieurs colonnes.",
         "instruction_4": "4. **Générer des Informations**: Cliquez sur le bouton \"Générer des Informations\" pour afficher les statistiques descriptives et autres informations sur les données. Cela inclut les statistiques de base et une matrice de corrélation pour les colonnes numériques.",
         "instruction_5": "5. **Visualiser les Données**: Sous les informations, utilisez Pygwalker pour créer des visualisations interactives. Ces visualisations sont hautement personnalisables et vous permettent d'explorer les données en profondeur.",
-        "instruction_6": "6. **Former un Modèle de Machine Learning**: Sélectionnez les caractéristiques et une colonne cible pour former un modèle de régression linéaire simple ou un modèle d'arbre de décision.",
+        "instruction_6": "6. **Former un Modèle de Machine Learning**: Sélectionnez les caractéristiques et une colonne cible pour former un modèle de régression linéaire, d'arbre de décision ou de régression SGD (descente de gradient stochastique).",
         "ml_instruction": """
         ### Que fait le modèle de Machine Learning ?
 
-        Le modèle de machine learning implémenté dans cet outil est un simple modèle de régression linéaire ou un modèle d'arbre de décision. Voici ce qu'il fait :
+        Le modèle de machine learning implémenté dans cet outil est un modèle de régression linéaire, d'arbre de décision ou de régression SGD (descente de gradient stochastique). Voici ce qu'il fait :
 
         1. **Sélection des caractéristiques**: Choisissez une ou plusieurs colonnes de votre jeu de données à utiliser comme caractéristiques (variables indépendantes) pour le modèle.
         2. **Sélection de la cible**: Choisissez une colonne de votre jeu de données à utiliser comme cible (variable dépendante) pour le modèle.
-        3. **Entraîner le modèle**: L'outil divise les données en ensembles d'entraînement et de test, entraîne un modèle de régression linéaire ou un modèle d'arbre de décision sur les données d'entraînement et l'évalue sur les données de test.
+        3. **Entraîner le modèle**: L'outil divise les données en ensembles d'entraînement et de test, entraîne le modèle choisi sur les données d'entraînement et l'évalue sur les données de test.
         4. **Performance du modèle**: L'outil fournit l'erreur quadratique moyenne (MSE) et le score R² pour évaluer les performances du modèle.
         """,
         "insights_explanation": """
@@ -186,7 +396,87 @@ translations = {
         **Erreur Quadratique Moyenne (MSE)**: Il s'agit de la moyenne des différences quadratiques entre les valeurs réelles et prévues. Une MSE plus faible indique un meilleur ajustement.
 
         **Score R²**: Ce score représente la proportion de la variance dans la variable dépendante qui est prévisible à partir des variables indépendantes. Un score R² proche de 1 indique un bon ajustement.
-        """
+        """,
+        "cache_hit": "Chargé depuis le cache, le classeur n'a pas été analysé à nouveau.",
+        "ingestion_mode": "Mode de lecture",
+        "ingestion_auto": "Automatique (flux pour les gros fichiers)",
+        "ingestion_standard": "Standard",
+        "ingestion_streaming": "Flux (lecture seule, mémoire réduite)",
+        "streaming_progress": "{rows:,} lignes lues ({rate:,} lignes/s)",
+        "select_sheets": "Sélectionnez les feuilles à charger",
+        "sheet_load_times": "Temps de chargement des feuilles",
+        "memory_report": "Mémoire : {before} avant l'optimisation des types, {after} après ({ratio:.1f}x plus petit)",
+        "column_types": "Types de colonnes et mémoire",
+        "fast_mode": "Mode rapide (statistiques échantillonnées)",
+        "sample_size": "Taille de l'échantillon (lignes)",
+        "stratify_by": "Stratifier l'échantillon par",
+        "stratify_none": "Sans stratification",
+        "fast_mode_caption": "Résultats approximatifs sur un échantillon de {rows:,} lignes sur {total:,}, avec des intervalles de confiance à {confidence:.0%}.",
+        "confidence_intervals": "Intervalles de confiance :",
+        "exact_refresh": "Calculer les statistiques exactes sur toutes les lignes",
+        "viz_settings": "Paramètres des données de visualisation",
+        "viz_row_budget": "Nombre maximal de lignes envoyées à l'explorateur",
+        "viz_group_by": "Pré-agréger par colonnes (facultatif)",
+        "viz_aggregation": "Agrégation",
+        "viz_downsampled": "Affichage d'un échantillon aléatoire de {rows:,} lignes sur {total:,}.",
+        "ml_max_depth": "Profondeur maximale de l'arbre (0 = illimitée)",
+        "ml_min_samples_split": "Nombre minimal d'échantillons pour diviser un nœud",
+        "ml_export_model": "Télécharger le modèle entraîné",
+        "ml_import_model": "Évaluer ces données avec un modèle exporté précédemment",
+        "ml_import_warning": "Seuls les fichiers de modèle exportés par ce serveur peuvent être importés ; les autres sont rejetés avant d'être ouverts.",
+        "ml_import_error": "Le modèle n'a pas pu être appliqué",
+        "ml_imported_model": "Prédictions du modèle {model} importé pour '{target}' :",
+        "ml_download_predictions": "Télécharger les prédictions (CSV)",
+        "ml_prepare_predictions": "Préparer les prédictions pour le téléchargement (CSV)",
+        "ml_evaluation": "Évaluation",
+        "ml_evaluation_split": "Division entraînement/test",
+        "ml_evaluation_cv": "Validation croisée",
+        "ml_evaluation_grid": "Recherche par grille",
+        "ml_evaluation_random": "Recherche aléatoire",
+        "ml_folds": "Nombre de plis",
+        "ml_n_jobs": "Tâches parallèles (-1 = tous les cœurs)",
+        "ml_n_iter": "Candidats de la recherche aléatoire",
+        "ml_patience": "Arrêt anticipé : candidats sans amélioration (0 = désactivé)",
+        "ml_search_progress": "{done} plis sur {total} terminés",
+        "ml_fold_results": "Scores et durées par pli",
+        "ml_search_summary": "Candidats classés par R² moyen sur les plis :",
+        "ml_best_params": "Meilleurs hyperparamètres : {params}",
+        "stored_datasets": "Rouvrir un jeu de données enregistré",
+        "stored_datasets_none": "Aucun (télécharger un fichier)",
+        "store_hit": "Ouvert depuis le stockage local des jeux de données, le classeur n'a pas été analysé à nouveau.",
+        "perf_panel": "Performances",
+        "perf_no_stages": "Aucune étape du traitement n'a été exécutée lors de cette interaction.",
+        "perf_download_json": "Télécharger les durées des étapes (JSON)",
+        "perf_trace_memory": "Suivre le pic de mémoire par étape (plus lent)",
+        "perf_memory_caption": "Le pic de mémoire est mesuré pour l'ensemble du processus serveur : les étapes exécutées en même temps dans d'autres sessions ou tâches en arrière-plan s'ajoutent aux chiffres les unes des autres.",
+        "perf_profile_next": "Profiler la prochaine interaction avec cProfile",
+        "perf_download_pstats": "Télécharger les statistiques cProfile",
+        "section": "Section",
+        "section_insights": "Informations",
+        "section_visualization": "Visualisation Interactive",
+        "section_ml": "Machine Learning",
+        "run_in_background": "Exécuter les analyses et l'entraînement en arrière-plan",
+        "job_submitted": "Tâche d'arrière-plan n°{id} lancée. Vous pouvez continuer l'exploration ; les résultats apparaîtront ici une fois terminée.",
+        "job_already_running": "Ce calcul est déjà en cours en arrière-plan.",
+        "job_limit": "Vous avez déjà {limit} tâches en arrière-plan. Attendez qu'une se termine ou annulez-la.",
+        "job_result_caption": "Résultat de la dernière exécution en arrière-plan pour cette sélection :",
+        "jobs_panel": "Tâches en arrière-plan",
+        "jobs_none": "Aucune tâche en arrière-plan dans cette session.",
+        "job_status_queued": "en attente",
+        "job_status_running": "en cours",
+        "job_status_done": "terminée",
+        "job_status_failed": "échouée",
+        "job_status_cancelled": "annulée",
+        "job_cancel": "Annuler",
+        "job_refresh": "Actualiser",
+        "ingestion_out_of_core": "Hors mémoire (par blocs, pour les données plus grandes que la mémoire)",
+        "out_of_core_caption": "Mode hors mémoire : les données sont traitées par blocs de {rows:,} lignes et ne sont jamais chargées en entier. Les statistiques sont exactes, sauf les percentiles, estimés à partir d'un échantillon sur de très grands volumes. La visualisation interactive n'est pas disponible dans ce mode.",
+        "out_of_core_ml_caption": "Les modèles sont entraînés de manière incrémentale avec {model}, un bloc à la fois.",
+        "ml_epochs": "Passages sur les données (époques)",
+        "ml_alpha": "Force de régularisation (alpha)",
+        "ml_penalty": "Pénalité",
+        "stored_datasets_delete": "Supprimer ce jeu de données enregistré",
+        "store_save_failed": "Ce jeu de données n'a pas pu être enregistré pour être rouvert : les colonnes mêlant nombres et texte, ou les noms de colonnes en double, ne peuvent pas être stockés.",
     },
     "de": {
         "title": "Excel-Dateianalysetool",
@@ -196,15 +486,15 @@ translations = {
         "instruction_3": "3. **Wählen Sie Spalten zur Analyse aus**: Wählen Sie die Spalten aus, die Sie aus der hochgeladenen Excel-Datei zur Analyse verwenden möchten. Verwenden Sie das Dropdown-Menü zur Mehrfachauswahl, um mehrere Spalten auszuwählen.",
         "instruction_4": "4. **Erzeugen Sie Erkenntnisse**: Klicken Sie auf die Schaltfläche \"Erkenntnisse generieren\", um beschreibende Statistiken und andere Erkenntnisse aus den Daten anzuzeigen. Dies umfasst grundlegende Statistiken und eine Korrelationsmatrix für numerische Spalten.",
         "instruction_5": "5. **Daten visualisieren**: Unterhalb der Erkenntnisse verwenden Sie Pygwalker, um interaktive Visualisierungen zu erstellen. Diese Visualisierungen sind hochgradig anpassbar und ermöglichen es Ihnen, die Daten im Detail zu erkunden.",
-        "instruction_6": "6. **Trainieren Sie ein Machine Learning Modell**: Wählen Sie Funktionen und eine Zielspalte, um ein einfaches lineares Regressionsmodell oder ein Entscheidungsbaum-Regressionsmodell zu trainieren.",
+        "instruction_6": "6. **Trainieren Sie ein Machine Learning Modell**: Wählen Sie Funktionen und eine Zielspalte, um ein lineares Regressionsmodell, ein Entscheidungsbaum-Regressionsmodell oder ein SGD-Regressionsmodell (stochastischer Gradientenabstieg) zu trainieren.",
         "ml_instruction": """
         ### Was macht das Machine Learning Modell?
 
-        Das Machine Learning Modell, das in diesem Tool implementiert ist, ist ein einfaches lineares Regressionsmodell oder ein Entscheidungsbaum-Regressionsmodell. Hier ist, was es tut:
+        Das Machine Learning Modell, das in diesem Tool implementiert ist, ist ein lineares Regressionsmodell, ein Entscheidungsbaum-Regressionsmodell oder ein SGD-Regressionsmodell (stochastischer Gradientenabstieg). Hier ist, was es tut:
 
         1. **Merkmalsauswahl**: Wählen Sie eine oder mehrere Spalten aus Ihrem Datensatz aus, die als Merkmale (unabhängige Variablen) für das Modell verwendet werden sollen.
         2. **Zielauswahl**: Wählen Sie eine Spalte aus Ihrem Datensatz aus, die als Ziel (abhängige Variable) für das Modell verwendet werden soll.
-        3. **Modell trainieren**: Das Tool teilt die Daten in Trainings- und Testmengen auf, trainiert ein lineares Regressionsmodell oder ein Entscheidungsbaum-Regressionsmodell mit den Trainingsdaten und bewertet es mit den Testdaten.
+        3. **Modell trainieren**: Das Tool teilt die Daten in Trainings- und Testmengen auf, trainiert das gewählte Modell mit den Trainingsdaten und bewertet es mit den Testdaten.
         4. **Modellleistung**: Das Tool liefert den mittleren quadratischen Fehler (MSE) und den R²-Score zur Bewertung der Modellleistung.
         """,
         "insights_explanation": """
@@ -242,7 +532,87 @@ translations = {
         **Mittlerer quadratischer Fehler (MSE)**: Dies ist der Durchschnitt der quadrierten Unterschiede zwischen den tatsächlichen und vorhergesagten Werten. Ein niedrigerer MSE weist auf eine bessere Übereinstimmung hin.
 
         **R²-Score**: Dieser Score gibt den Anteil der Varianz in der abhängigen Variable an, der durch die unabhängigen Variablen vorhergesagt werden kann. Ein R²-Score nahe 1 weist auf eine gute Übereinstimmung hin.
-        """
+        """,
+        "cache_hit": "Aus dem Cache geladen, die Arbeitsmappe wurde nicht erneut eingelesen.",
+        "ingestion_mode": "Einlesemodus",
+        "ingestion_auto": "Automatisch (große Dateien streamen)",
+        "ingestion_standard": "Standard",
+        "ingestion_streaming": "Streaming (nur lesen, wenig Speicher)",
+        "streaming_progress": "{rows:,} Zeilen gelesen ({rate:,} Zeilen/s)",
+        "select_sheets": "Wählen Sie die zu ladenden Blätter",
+        "sheet_load_times": "Ladezeiten der Blätter",
+        "memory_report": "Speicher: {before} vor der Typoptimierung, {after} danach ({ratio:.1f}x kleiner)",
+        "column_types": "Spaltentypen und Speicher",
+        "fast_mode": "Schnellmodus (Stichprobenstatistik)",
+        "sample_size": "Stichprobengröße (Zeilen)",
+        "stratify_by": "Stichprobe schichten nach",
+        "stratify_none": "Keine Schichtung",
+        "fast_mode_caption": "Näherungswerte aus einer Stichprobe von {rows:,} von {total:,} Zeilen, mit {confidence:.0%}-Konfidenzintervallen.",
+        "confidence_intervals": "Konfidenzintervalle:",
+        "exact_refresh": "Exakte Statistiken über alle Zeilen berechnen",
+        "viz_settings": "Einstellungen der Visualisierungsdaten",
+        "viz_row_budget": "Maximale Zeilenzahl für den Explorer",
+        "viz_group_by": "Vorab nach Spalten aggregieren (optional)",
+        "viz_aggregation": "Aggregation",
+        "viz_downsampled": "Angezeigt wird eine Zufallsstichprobe von {rows:,} von {total:,} Zeilen.",
+        "ml_max_depth": "Maximale Baumtiefe (0 = unbegrenzt)",
+        "ml_min_samples_split": "Mindestanzahl an Stichproben zum Teilen eines Knotens",
+        "ml_export_model": "Trainiertes Modell herunterladen",
+        "ml_import_model": "Diese Daten mit einem zuvor exportierten Modell bewerten",
+        "ml_import_warning": "Nur von diesem Server exportierte Modelldateien können importiert werden; andere Dateien werden vor dem Öffnen abgelehnt.",
+        "ml_import_error": "Das Modell konnte nicht angewendet werden",
+        "ml_imported_model": "Vorhersagen des importierten {model}-Modells für '{target}':",
+        "ml_download_predictions": "Vorhersagen herunterladen (CSV)",
+        "ml_prepare_predictions": "Vorhersagen zum Herunterladen vorbereiten (CSV)",
+        "ml_evaluation": "Bewertung",
+        "ml_evaluation_split": "Trainings-/Testaufteilung",
+        "ml_evaluation_cv": "Kreuzvalidierung",
+        "ml_evaluation_grid": "Rastersuche",
+        "ml_evaluation_random": "Zufallssuche",
+        "ml_folds": "Anzahl der Folds",
+        "ml_n_jobs": "Parallele Jobs (-1 = alle Kerne)",
+        "ml_n_iter": "Kandidaten der Zufallssuche",
+        "ml_patience": "Frühes Stoppen: Kandidaten ohne Verbesserung (0 = aus)",
+        "ml_search_progress": "{done} von {total} Folds abgeschlossen",
+        "ml_fold_results": "Ergebnisse und Laufzeiten pro Fold",
+        "ml_search_summary": "Kandidaten nach mittlerem R² über die Folds:",
+        "ml_best_params": "Beste Hyperparameter: {params}",
+        "stored_datasets": "Gespeicherten Datensatz erneut öffnen",
+        "stored_datasets_none": "Keiner (Datei hochladen)",
+        "store_hit": "Aus dem lokalen Datensatzspeicher geöffnet, die Arbeitsmappe wurde nicht erneut eingelesen.",
+        "perf_panel": "Leistung",
+        "perf_no_stages": "In dieser Interaktion wurden keine Verarbeitungsschritte ausgeführt.",
+        "perf_download_json": "Zeiten der Schritte herunterladen (JSON)",
+        "perf_trace_memory": "Spitzenspeicher pro Schritt messen (langsamer)",
+        "perf_memory_caption": "Der Spitzenspeicher wird für den gesamten Serverprozess gemessen; gleichzeitig laufende Schritte anderer Sitzungen oder Hintergrundaufgaben fließen in die Werte der jeweils anderen ein.",
+        "perf_profile_next": "Nächste Interaktion mit cProfile profilieren",
+        "perf_download_pstats": "cProfile-Statistiken herunterladen",
+        "section": "Bereich",
+        "section_insights": "Erkenntnisse",
+        "section_visualization": "Interaktive Visualisierung",
+        "section_ml": "Machine Learning",
+        "run_in_background": "Erkenntnisse und Training im Hintergrund ausführen",
+        "job_submitted": "Hintergrundauftrag Nr. {id} gestartet. Sie können weiterarbeiten; die Ergebnisse erscheinen hier, sobald er fertig ist.",
+        "job_already_running": "Diese Berechnung läuft bereits im Hintergrund.",
+        "job_limit": "Es laufen bereits {limit} Hintergrundaufträge. Warten Sie, bis einer fertig ist, oder brechen Sie ihn ab.",
+        "job_result_caption": "Ergebnis des letzten Hintergrundlaufs für diese Auswahl:",
+        "jobs_panel": "Hintergrundaufträge",
+        "jobs_none": "Keine Hintergrundaufträge in dieser Sitzung.",
+        "job_status_queued": "wartend",
+        "job_status_running": "läuft",
+        "job_status_done": "fertig",
+        "job_status_failed": "fehlgeschlagen",
+        "job_status_cancelled": "abgebrochen",
+        "job_cancel": "Abbrechen",
+        "job_refresh": "Aktualisieren",
+        "ingestion_out_of_core": "Out-of-Core (blockweise, für Daten größer als der Arbeitsspeicher)",
+        "out_of_core_caption": "Out-of-Core-Modus: Die Daten werden in Blöcken von {rows:,} Zeilen verarbeitet und nie vollständig geladen. Die Statistiken sind exakt, außer den Perzentilen, die bei sehr großen Daten aus einer Stichprobe geschätzt werden. Die interaktive Visualisierung ist in diesem Modus nicht verfügbar.",
+        "out_of_core_ml_caption": "Modelle werden inkrementell mit {model} trainiert, Block für Block.",
+        "ml_epochs": "Durchläufe über die Daten (Epochen)",
+        "ml_alpha": "Regularisierungsstärke (alpha)",
+        "ml_penalty": "Strafterm",
+        "stored_datasets_delete": "Diesen gespeicherten Datensatz löschen",
+        "store_save_failed": "Dieser Datensatz konnte nicht zum erneuten Öffnen gespeichert werden: Spalten, die Zahlen und Text mischen, oder doppelte Spaltennamen können nicht gespeichert werden.",
     }
 }
 
@@ -250,21 +620,111 @@ translations = {
 def translate_text(language, key):
     return translations[language].get(key, key)
 
+def get_profiler():
+    # A fresh profiler is installed by main() for every rerun.
+    return st.session_state.get("profiler")
+
+@st.cache_resource
+def get_workbook_cache():
+    # Shared by all sessions; Streamlit re-executes this script on every rerun,
+    # so module-level state would not survive between interactions.
+    return WorkbookCache(CACHE_MAX_BYTES, spill_dir=CACHE_SPILL_DIR)
+
+@st.cache_resource
+def get_stats_cache():
+    return StatsCache()
+
+@st.cache_resource
+def get_visualization_cache():
+    # Entries are (html, rows shown) pairs, budgeted by the HTML length.
+    return LRUCache(VIZ_CACHE_MAX_BYTES, sizeof=lambda entry: len(entry[0]))
+
+@st.cache_resource
+def get_chunked_stats_cache():
+    return LRUCache(STATS_CACHE_DATASETS)
+
+@st.cache_resource
+def get_model_cache():
+    # Entries are (model, metrics, exported bytes); a fitted pipeline takes
+    # about as much memory as its export.
+    return LRUCache(MODEL_CACHE_MAX_BYTES, sizeof=lambda entry: 2 * len(entry[2]))
+
+@st.cache_resource
+def get_model_secret():
+    return MODEL_SECRET.encode("utf-8") if MODEL_SECRET else secrets.token_bytes(32)
+
+@st.cache_resource
+def get_dataset_store():
+    return DatasetStore(STORE_DIR, max_bytes=STORE_MAX_BYTES) if STORE_DIR else None
+
+@st.cache_resource
+def get_process_pool():
+    # "spawn" avoids forking the multi-threaded Streamlit server; the pool is
+    # created once and shared, so the worker start-up cost is paid only once.
+    return ProcessPoolExecutor(max_workers=LOAD_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+@st.cache_resource
+def get_job_manager():
+    # Threads rather than processes: jobs read the session's DataFrame without
+    # pickling it, and pandas and scikit-learn release the GIL while computing.
+    return JobManager(JOB_WORKERS, max_active_per_owner=MAX_JOBS_PER_SESSION)
+
+def session_owner():
+    # Jobs belong to the browser session that submitted them.
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex
+    return st.session_state["session_id"]
+
+@st.cache_data
+def get_sheet_names(file_hash, _uploaded_file):
+    with open_upload(_uploaded_file, SPOOL_THRESHOLD_BYTES) as source:
+        return list_sheets(source)
+
 def handle_file_upload(upload_type, file_types, language):
-    uploaded_file = st.file_uploader(translate_text(language, "choose_file"), type=file_types, key=upload_type)
-    if uploaded_file:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_types[0]}') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_file_path = tmp_file.name
-        logging.info(f"File uploaded: {uploaded_file.name}")
-        return tmp_file_path, uploaded_file.name
-    return None, None
-
-def read_excel(file, language):
+    uploaded_files = st.file_uploader(translate_text(language, "choose_file"), type=file_types, key=upload_type, accept_multiple_files=True)
+    uploads = []
+    for uploaded_file in uploaded_files or []:
+        with profiled(get_profiler(), "upload", file=uploaded_file.name, bytes=uploaded_file.size):
+            file_hash = content_hash(uploaded_file.getbuffer())
+        logging.info(f"File uploaded: {uploaded_file.name} ({file_hash})")
+        uploads.append((uploaded_file, uploaded_file.name, file_hash))
+    return uploads
+
+def streaming_progress(language):
+    progress_bar = st.progress(0.0)
+    status = st.empty()
+
+    def update(rows_read, total_rows, elapsed):
+        rate = rows_read / elapsed if elapsed else 0
+        status.caption(translate_text(language, "streaming_progress").format(rows=rows_read, rate=int(rate)))
+        if total_rows:
+            progress_bar.progress(min(rows_read / total_rows, 1.0))
+    return update
+
+def read_excel(uploaded_file, language, file_hash=None, streaming=False, sheet_name=0):
+    cache = get_workbook_cache()
+    cache_key = sheet_cache_key(file_hash, sheet_name) if file_hash else None
+    if cache_key:
+        df = cache.get(cache_key)
+        if df is not None:
+            logging.info(f"Excel file served from cache ({file_hash})")
+            st.caption(translate_text(language, "cache_hit"))
+            return df
     try:
         logging.info("Reading Excel file...")
-        df = pd.read_excel(file, engine='openpyxl')
+        # The upload is only opened (and large ones spooled) on a cache miss.
+        with profiled(get_profiler(), "parse", streaming=streaming) as stage, \
+                open_upload(uploaded_file, SPOOL_THRESHOLD_BYTES) as source:
+            if streaming:
+                df = read_excel_streaming(source, sheet_name=sheet_name, progress=streaming_progress(language))
+            else:
+                df = pd.read_excel(source, sheet_name=sheet_name, engine='openpyxl')
+            stage["rows"] = len(df)
         logging.info("Excel file read successfully!")
+        with profiled(get_profiler(), "dtype inference", rows=len(df)):
+            df = optimize_dtypes(df)
+        if cache_key and not df.empty:
+            cache.put(cache_key, df)
         return df
     except Exception as e:
         error_message = translate_text(language, "file_empty_error") + f": {e}"
@@ -272,32 +732,321 @@ def read_excel(file, language):
         st.error(error_message)
         return pd.DataFrame()
 
-def generate_insights(df, language):
+def format_bytes(size):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+def show_memory_report(df, language):
+    # Deep memory usage scans every string, so prefer the figures recorded
+    # when the frame was loaded.
+    memory_after = df.attrs.get("memory_after")
+    if memory_after is None:
+        memory_after = int(df.memory_usage(index=True, deep=True).sum())
+    memory_before = df.attrs.get("memory_before", memory_after)
+    ratio = memory_before / memory_after if memory_after else 1.0
+    st.caption(translate_text(language, "memory_report").format(
+        before=format_bytes(memory_before), after=format_bytes(memory_after), ratio=ratio))
+    if st.checkbox(translate_text(language, "column_types")):
+        st.dataframe(pd.DataFrame({
+            "dtype": df.dtypes.astype(str),
+            "memory": df.memory_usage(index=False, deep=True).map(format_bytes)
+        }))
+
+def read_excel_sheets(selections, language, streaming=False):
+    """Load several (uploaded_file, file_name, file_hash, sheet_name) selections.
+
+    Cached sheets are reused; the rest are parsed in parallel on the shared
+    process pool. Returns one frame with a source column, plus a table of
+    per-sheet parse times.
+    """
+    cache = get_workbook_cache()
+    frames, timings, tasks, labels, paths = {}, {}, [], {}, {}
+    with contextlib.ExitStack() as spools:
+        for uploaded_file, file_name, file_hash, sheet_name in selections:
+            key = sheet_cache_key(file_hash, sheet_name)
+            labels[key] = f"{file_name} / {sheet_name}"
+            df = cache.get(key)
+            if df is not None:
+                frames[key] = df
+                timings[key] = (0.0, True)
+            else:
+                # Each file is written to disk once; workers receive only its path.
+                if file_hash not in paths:
+                    paths[file_hash] = spools.enter_context(spool_to_path(uploaded_file))
+                tasks.append((key, paths[file_hash], sheet_name))
+        if tasks:
+            parallel_start = time.perf_counter()
+            progress_bar = st.progress(0.0)
+            executor = get_process_pool() if LOAD_WORKERS > 1 else None
+            for done, (key, df, seconds, error) in enumerate(load_sheets(tasks, streaming, executor), 1):
+                progress_bar.progress(done / len(tasks))
+                if error is not None:
+                    error_message = translate_text(language, "file_empty_error") + f" ({labels[key]}): {error}"
+                    logging.error(error_message)
+                    st.error(error_message)
+                    continue
+                logging.info(f"Parsed {labels[key]} in {seconds:.2f}s")
+                if get_profiler():
+                    # Measured inside the worker; includes dtype inference.
+                    get_profiler().add("parse + dtype inference (worker)", seconds, len(df), sheet=labels[key])
+                if not df.empty:
+                    cache.put(key, df)
+                frames[key] = df
+                timings[key] = (seconds, False)
+            progress_bar.empty()
+            if get_profiler():
+                get_profiler().add("parse (parallel wall time)", time.perf_counter() - parallel_start,
+                                   sum(len(frames[key]) for key, _, _ in tasks if key in frames), sheets=len(tasks))
+
+    # Keep the user's selection order rather than completion order.
+    ordered = {labels[key]: frames[key] for key in labels if key in frames}
+    timing_table = pd.DataFrame(
+        [{"sheet": labels[key], "rows": len(frames[key]), "seconds": round(timings[key][0], 3), "cached": timings[key][1]}
+         for key in labels if key in frames]
+    )
+    if not ordered:
+        return pd.DataFrame(), timing_table
+    return combine_frames(ordered), timing_table
+
+def open_stored_dataset(dataset_key, language):
+    # Frames opened from the store are shared through the workbook cache too,
+    # so sessions reuse the same memory-mapped object.
+    cache = get_workbook_cache()
+    df = cache.get(dataset_key)
+    if df is None:
+        df = get_dataset_store().load(dataset_key)
+        cache.put(dataset_key, df)
+        logging.info(f"Opened stored dataset {dataset_key}")
+    st.caption(translate_text(language, "store_hit"))
+    return df
+
+def choose_stored_dataset(language):
+    store = get_dataset_store()
+    entries = store.catalog() if store else []
+    if not entries:
+        return None
+    names = {entry["key"]: f"{entry['name']} ({entry['rows']:,} × {entry['columns']}, {format_bytes(entry['bytes'])})" for entry in entries}
+    selected = st.sidebar.selectbox(
+        translate_text(language, "stored_datasets"),
+        [None] + list(names),
+        format_func=lambda key: translate_text(language, "stored_datasets_none") if key is None else names[key]
+    )
+    if selected is not None and st.sidebar.button(translate_text(language, "stored_datasets_delete")):
+        store.delete(selected)
+        get_workbook_cache().pop(selected)
+        logging.info(f"Deleted stored dataset {selected}")
+        return None
+    return selected
+
+def generate_insights(df, language, dataset_key=None):
     if not df.empty:
-        st.write(translate_text(language, "descriptive_statistics"), df.describe())
+        stats_cache = get_stats_cache()
+        with profiled(get_profiler(), "describe", rows=len(df)):
+            statistics = stats_cache.describe(df, dataset_key)
+        st.write(translate_text(language, "descriptive_statistics"), statistics)
         st.write(translate_text(language, "insights_explanation"))
         numeric_df = df.select_dtypes(include=['number'])
         if not numeric_df.empty:
             st.write(translate_text(language, "correlation_matrix"))
-            corr_matrix = numeric_df.corr()
+            with profiled(get_profiler(), "corr", rows=len(numeric_df), columns=numeric_df.shape[1]):
+                corr_matrix = stats_cache.corr(numeric_df, dataset_key)
             st.dataframe(corr_matrix)
         else:
             st.write(translate_text(language, "no_numeric_columns"))
     else:
         st.write(translate_text(language, "no_data_available"))
 
+def insights_job(job, df, dataset_key, stats_cache):
+    # Runs on a job thread: no Streamlit calls, progress goes through the job.
+    # StatsCache calls back between columns and row blocks, which is where a
+    # cancellation takes effect.
+    job.report(0.0, "describe")
+    statistics = stats_cache.describe(df, dataset_key, progress=lambda done, total: job.report(0.5 * done / total, "describe"))
+    numeric_df = df.select_dtypes(include=['number'])
+    job.report(0.5, "corr")
+    corr_matrix = (stats_cache.corr(numeric_df, dataset_key, progress=lambda done, total: job.report(0.5 + 0.5 * done / total, "corr"))
+                   if not numeric_df.empty else None)
+    return {"statistics": statistics, "correlation": corr_matrix}
+
+def show_insights_result(result, language):
+    st.write(translate_text(language, "descriptive_statistics"), result["statistics"])
+    st.write(translate_text(language, "insights_explanation"))
+    if result["correlation"] is not None:
+        st.write(translate_text(language, "correlation_matrix"))
+        st.dataframe(result["correlation"])
+    else:
+        st.write(translate_text(language, "no_numeric_columns"))
+
+def format_interval(lower, upper):
+    formatted = lower.astype(object)
+    for i in range(lower.shape[1]):
+        formatted.isetitem(i, ["" if pd.isna(lo) else f"{lo:.4g} – {hi:.4g}" for lo, hi in zip(lower.iloc[:, i], upper.iloc[:, i])])
+    return formatted
+
+def generate_approximate_insights(sample, population_rows, language, confidence=0.95):
+    if sample.empty:
+        st.write(translate_text(language, "no_data_available"))
+        return
+    st.caption(translate_text(language, "fast_mode_caption").format(rows=len(sample), total=population_rows, confidence=confidence))
+    with profiled(get_profiler(), "describe (sampled)", rows=len(sample)):
+        estimates, lower, upper = approximate_describe(sample, population_rows, confidence)
+    if estimates.empty:
+        st.write(translate_text(language, "descriptive_statistics"), sample.describe())
+    else:
+        st.write(translate_text(language, "descriptive_statistics"), estimates)
+        st.write(translate_text(language, "confidence_intervals"), format_interval(lower, upper))
+    st.write(translate_text(language, "insights_explanation"))
+    numeric_df = sample.select_dtypes(include=['number'])
+    if not numeric_df.empty:
+        st.write(translate_text(language, "correlation_matrix"))
+        corr_matrix = numeric_df.corr()
+        st.dataframe(corr_matrix)
+        st.write(translate_text(language, "confidence_intervals"), format_interval(*correlation_interval(corr_matrix, len(numeric_df), confidence)))
+    else:
+        st.write(translate_text(language, "no_numeric_columns"))
+
+def render_visualization(df, language, cache_key):
+    with st.expander(translate_text(language, "viz_settings")):
+        row_budget = st.number_input(translate_text(language, "viz_row_budget"), min_value=1000, value=VIZ_ROW_BUDGET, step=10000)
+        group_by = st.multiselect(translate_text(language, "viz_group_by"), df.columns.tolist())
+        aggregation = st.selectbox(translate_text(language, "viz_aggregation"), AGGREGATIONS, disabled=not group_by)
+
+    # Serializing the explorer is the expensive part, so the HTML is reused
+    # for as long as the data, column selection and settings are unchanged.
+    html_key = content_hash(repr((cache_key, df.columns.tolist(), row_budget, group_by, aggregation)).encode("utf-8"))
+    viz_cache = get_visualization_cache()
+    entry = viz_cache.get(html_key)
+    if entry is None:
+        viz_df = prepare_visualization_frame(df, row_budget, group_by, aggregation)
+        # Pygwalker is only imported once the explorer is first shown.
+        import pygwalker as pyg
+
+        # Initialize Pygwalker interface and render as HTML in Streamlit
+        with profiled(get_profiler(), "pygwalker html", rows=len(viz_df)):
+            entry = (pyg.walk(viz_df).to_html(), len(viz_df))
+        viz_cache.put(html_key, entry)
+    html, rows_shown = entry
+    if rows_shown < len(df) and not group_by:
+        st.caption(translate_text(language, "viz_downsampled").format(rows=rows_shown, total=len(df)))
+    st.components.v1.html(html, height=800, scrolling=True)
+
 # Machine Learning Model Training Function
-def train_ml_model(df, language):
+def model_hyperparameters(model_choice, language):
+    if model_choice == "SGD Regressor":
+        alpha = st.number_input(translate_text(language, "ml_alpha"), min_value=0.0, value=0.0001, step=0.0001, format="%.5f")
+        penalty = st.selectbox(translate_text(language, "ml_penalty"), ["l2", "l1", "elasticnet"])
+        return {"alpha": alpha, "penalty": penalty}
+    if model_choice != "Decision Tree Regressor":
+        return {}
+    max_depth = st.number_input(translate_text(language, "ml_max_depth"), min_value=0, value=0)
+    min_samples_split = st.number_input(translate_text(language, "ml_min_samples_split"), min_value=2, value=2)
+    return {"max_depth": max_depth or None, "min_samples_split": min_samples_split}
+
+def score_with_imported_model(df, language, dataset_key=None):
+    model_file = st.file_uploader(translate_text(language, "ml_import_model"), type=["joblib"], key="model_import")
+    st.caption(translate_text(language, "ml_import_warning"))
+    if not model_file:
+        return
+    # The uploaded model stays in the widget across reruns; only unpickle
+    # and predict again when the model, the data or its columns change.
+    score_key = content_hash(repr((content_hash(model_file.getbuffer()), dataset_key, df.columns.tolist())).encode("utf-8"))
+    scoring = st.session_state.get("imported_scoring")
+    if dataset_key is None or scoring is None or scoring["key"] != score_key:
+        try:
+            artifact = import_model(model_file.getvalue(), get_model_secret())
+            scored = score_frame(artifact, df)
+        except Exception as e:
+            st.error(f"{translate_text(language, 'ml_import_error')}: {e}")
+            return
+        prediction_column = scored.columns[-1]
+        scoring = {"key": score_key, "model": artifact["model_choice"], "target": artifact["target"],
+                   "column": prediction_column, "predictions": scored[prediction_column].to_numpy(), "csv": None}
+        del scored
+        st.session_state["imported_scoring"] = scoring
+    st.write(translate_text(language, "ml_imported_model").format(model=scoring["model"], target=scoring["target"]))
+    st.dataframe(df.head().assign(**{scoring["column"]: scoring["predictions"][:5]}))
+    # Writing the CSV costs as much as scoring on large frames, so it is
+    # only built on request.
+    if scoring["csv"] is None and st.button(translate_text(language, "ml_prepare_predictions")):
+        scoring["csv"] = df.assign(**{scoring["column"]: scoring["predictions"]}).to_csv(index=False).encode("utf-8")
+    if scoring["csv"] is not None:
+        st.download_button(translate_text(language, "ml_download_predictions"), scoring["csv"], file_name="predictions.csv", mime="text/csv")
+
+def fit_model(df, dataset_key, feature_columns, target_column, model_choice, params):
+    # Unrelated widget changes rerun the script; reuse the fitted pipeline
+    # as long as the data and the model specification are unchanged.
+    model_cache = get_model_cache()
+    cache_key = model_cache_key(dataset_key, feature_columns, target_column, model_choice, params) if dataset_key else None
+    cached = model_cache.get(cache_key) if cache_key else None
+    if cached is None:
+        model, metrics = train_and_evaluate(df, feature_columns, target_column, model_choice, params, profiler=get_profiler())
+        exported = export_model(model, feature_columns, target_column, model_choice, params, metrics, get_model_secret())
+        if cache_key:
+            model_cache.put(cache_key, (model, metrics, exported))
+        return model, metrics, exported
+    logging.info(f"Reusing cached {model_choice} model")
+    return cached
+
+def train_job(job, df, feature_columns, target_column, model_choice, params, cache_key, model_cache, secret):
+    job.report(0.0, "fit")
+    # A fit is one uninterruptible call, so it runs in a process that
+    # cancelling the job terminates. Only the columns it needs are sent.
+    model, metrics = run_in_process(job, train_and_evaluate, df[list(feature_columns) + [target_column]],
+                                    feature_columns, target_column, model_choice, params)
+    job.report(0.9, "export")
+    exported = export_model(model, feature_columns, target_column, model_choice, params, metrics, secret)
+    model_cache.put(cache_key, (model, metrics, exported))
+    return model, metrics, exported
+
+def search_job(job, df, feature_columns, target_column, model_choice, candidates, n_splits, n_jobs, patience, spec):
+    fold_rows = []
+    total_folds = len(candidates) * n_splits
+    for row in cross_validate_candidates(df, feature_columns, target_column, model_choice, candidates,
+                                         n_splits=n_splits, n_jobs=n_jobs, patience=patience):
+        fold_rows.append(row)
+        # Cancelling stops the search between folds.
+        job.report(len(fold_rows) / total_folds, f"{len(fold_rows)}/{total_folds}")
+    summary = summarize_folds(fold_rows)
+    folds = pd.DataFrame(fold_rows).assign(params=lambda folds: folds["params"].map(repr))
+    return {"spec": spec, "folds": folds, "summary": summary, "best_params": candidates[summary.loc[0, "candidate"]]}
+
+def run_model_search(df, language, feature_columns, target_column, model_choice, candidates, n_splits, n_jobs, patience):
+    fold_rows = []
+    status = st.empty()
+    fold_table = st.empty()
+    total_folds = len(candidates) * n_splits
+    for row in cross_validate_candidates(df, feature_columns, target_column, model_choice, candidates,
+                                         n_splits=n_splits, n_jobs=n_jobs, patience=patience):
+        fold_rows.append(row)
+        status.caption(translate_text(language, "ml_search_progress").format(done=len(fold_rows), total=total_folds))
+        fold_table.dataframe(pd.DataFrame(fold_rows).assign(params=lambda folds: folds["params"].map(repr)))
+    status.empty()
+    return pd.DataFrame(fold_rows).assign(params=lambda folds: folds["params"].map(repr)), summarize_folds(fold_rows)
+
+def train_ml_model(df, language, dataset_key=None, background=False):
     st.write(f"### {translate_text(language, 'ml_section_title')}")
     
-    model_choice = st.selectbox(translate_text(language, "ml_model_choice"), ["Linear Regression", "Decision Tree Regressor"])
+    model_choice = st.selectbox(translate_text(language, "ml_model_choice"), MODEL_CHOICES)
+    evaluation = st.radio(
+        translate_text(language, "ml_evaluation"),
+        SEARCH_MODES,
+        format_func=lambda mode: translate_text(language, f"ml_evaluation_{mode}"),
+        horizontal=True
+    )
+    params = model_hyperparameters(model_choice, language) if evaluation in ("split", "cv") else {}
+    if evaluation != "split":
+        n_splits = st.slider(translate_text(language, "ml_folds"), min_value=2, max_value=10, value=5)
+        n_jobs = st.number_input(translate_text(language, "ml_n_jobs"), min_value=-1, value=-1)
+        n_iter = st.number_input(translate_text(language, "ml_n_iter"), min_value=1, value=10) if evaluation == "random" else 10
+        patience = st.number_input(translate_text(language, "ml_patience"), min_value=0, value=0) if evaluation in ("grid", "random") else 0
 
     columns = df.columns.tolist()
     feature_columns = st.multiselect(translate_text(language, "ml_select_features"), columns)
     target_column = st.selectbox(translate_text(language, "ml_select_target"), columns)
     
     if feature_columns and target_column:
-        X = df[feature_columns]
         y = df[target_column]
         
         if not pd.api.types.is_numeric_dtype(y):
@@ -309,38 +1058,233 @@ def train_ml_model(df, language):
                 st.error(f"Feature column '{col}' must be numeric.")
                 return
 
-        # Preprocessing pipeline
-        preprocessor = ColumnTransformer(
-            transformers=[
-                ('num', StandardScaler(), feature_columns)
-            ])
-
-        if model_choice == "Linear Regression":
-            model = Pipeline(steps=[('preprocessor', preprocessor),
-                                    ('regressor', LinearRegression())])
-        elif model_choice == "Decision Tree Regressor":
-            model = Pipeline(steps=[('preprocessor', preprocessor),
-                                    ('regressor', DecisionTreeRegressor(random_state=42))])
-
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
+        if evaluation != "split":
+            # Searches run only on request; the last result is kept in the
+            # session so that later reruns can still show it.
+            search_spec = model_cache_key(dataset_key, feature_columns, target_column, model_choice,
+                                          {"mode": evaluation, "params": params, "folds": n_splits, "n_iter": n_iter, "patience": patience})
+            if st.button(translate_text(language, "ml_train_button")):
+                candidates = search_candidates(model_choice, evaluation, params, n_iter=n_iter)
+                if background:
+                    # The finished job's result is moved into "model_search" by collect_finished_jobs.
+                    submit_job(language, "search", f"{model_choice} {evaluation} → {target_column}", search_job,
+                               df, feature_columns, target_column, model_choice, candidates, n_splits, n_jobs, patience,
+                               search_spec, key=("search", search_spec))
+                else:
+                    folds, summary = run_model_search(df, language, feature_columns, target_column, model_choice, candidates, n_splits, n_jobs, patience)
+                    best_params = candidates[summary.loc[0, "candidate"]]
+                    st.session_state["model_search"] = {"spec": search_spec, "folds": folds, "summary": summary, "best_params": best_params}
+            search = st.session_state.get("model_search")
+            if not search or search["spec"] != search_spec:
+                return
+            with st.expander(translate_text(language, "ml_fold_results")):
+                st.dataframe(search["folds"])
+            st.write(translate_text(language, "ml_search_summary"))
+            st.dataframe(search["summary"])
+            params = search["best_params"]
+            st.write(translate_text(language, "ml_best_params").format(params=params))
 
-        mse = mean_squared_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+        if background and dataset_key:
+            cache_key = model_cache_key(dataset_key, feature_columns, target_column, model_choice, params)
+            fitted = get_model_cache().get(cache_key) or st.session_state.get("job_results", {}).get(("train", cache_key))
+            if fitted is None:
+                if st.button(translate_text(language, "ml_train_button"), key="ml_train_background"):
+                    submit_job(language, "train", f"{model_choice} → {target_column}", train_job,
+                               df, feature_columns, target_column, model_choice, params, cache_key, get_model_cache(),
+                               get_model_secret(), key=("train", cache_key))
+                score_with_imported_model(df, language, dataset_key)
+                return
+            model, metrics, exported = fitted
+        else:
+            model, metrics, exported = fit_model(df, dataset_key, feature_columns, target_column, model_choice, params)
         
         st.write(f"### {translate_text(language, 'ml_model_performance')}")
-        st.write(f"{translate_text(language, 'ml_mse')}: {mse}")
-        st.write(f"{translate_text(language, 'ml_r2')}: {r2}")
+        st.write(f"{translate_text(language, 'ml_mse')}: {metrics['mse']}")
+        st.write(f"{translate_text(language, 'ml_r2')}: {metrics['r2']}")
 
         st.write(translate_text(language, "ml_performance_explanation"))
 
+        st.download_button(
+            translate_text(language, "ml_export_model"),
+            exported,
+            file_name="model.joblib",
+            mime="application/octet-stream"
+        )
+
+    score_with_imported_model(df, language, dataset_key)
+
+def analyze_dataset(df, language, dataset_key):
+    st.write(f"#### {translate_text(language, 'file_read_success')}")
+    st.dataframe(df.head())
+    show_memory_report(df, language)
+
+    columns = df.columns.tolist()
+    selected_columns = st.multiselect(translate_text(language, "select_columns"), columns, default=columns)
+
+    fast_mode = st.sidebar.checkbox(translate_text(language, "fast_mode"), value=len(df) > FAST_MODE_ROWS)
+    background = st.sidebar.checkbox(translate_text(language, "run_in_background"), key="run_in_background")
+    if fast_mode:
+        sample_size = st.sidebar.number_input(translate_text(language, "sample_size"), min_value=1000, value=DEFAULT_SAMPLE_ROWS, step=10000)
+        stratify_options = [None] + df.select_dtypes(include=['category']).columns.tolist()
+        stratify = st.sidebar.selectbox(
+            translate_text(language, "stratify_by"),
+            stratify_options,
+            format_func=lambda column: translate_text(language, "stratify_none") if column is None else str(column)
+        )
+    
+    if selected_columns:
+        df_selected = df[selected_columns]
+        # Only the open section runs, so the explorer and model training cost
+        # nothing on reruns that don't show them.
+        section = st.radio(
+            translate_text(language, "section"),
+            ["insights", "visualization", "ml"],
+            format_func=lambda name: translate_text(language, f"section_{name}"),
+            horizontal=True,
+            key="section"
+        )
+        if section == "insights":
+            insights_key = ("insights", dataset_key, tuple(selected_columns))
+            if st.button(translate_text(language, "generate_insights")):
+                st.write("Generating insights...")
+                if background and not fast_mode:
+                    submit_job(language, "insights", f"{translate_text(language, 'generate_insights')} ({len(selected_columns)})",
+                               insights_job, df_selected, dataset_key, get_stats_cache(), key=insights_key)
+                elif fast_mode and len(df) > sample_size:
+                    df_view = sample_rows(df, sample_size, stratify=stratify)[selected_columns]
+                    generate_approximate_insights(df_view, len(df_selected), language)
+                else:
+                    generate_insights(df_selected, language, dataset_key)
+            if fast_mode and st.button(translate_text(language, "exact_refresh")):
+                if background:
+                    submit_job(language, "insights", f"{translate_text(language, 'exact_refresh')} ({len(selected_columns)})",
+                               insights_job, df_selected, dataset_key, get_stats_cache(), key=insights_key)
+                else:
+                    generate_insights(df_selected, language, dataset_key)
+            if background and insights_key in st.session_state.get("job_results", {}):
+                st.caption(translate_text(language, "job_result_caption"))
+                show_insights_result(st.session_state["job_results"][insights_key], language)
+        elif section == "visualization":
+            st.write(f"### {translate_text(language, 'interactive_visualization')}")
+            df_view = sample_rows(df, sample_size, stratify=stratify)[selected_columns] if fast_mode else df_selected
+            view_key = (dataset_key, sample_size, stratify) if fast_mode else dataset_key
+            render_visualization(df_view, language, view_key)
+        else:
+            # Train Machine Learning Model
+            st.write(translate_text(language, "ml_instruction"))
+            train_ml_model(df_selected, language, dataset_key, background)
+    else:
+        st.warning(translate_text(language, "select_columns_warning"))
+
 # Excel File Analysis Function
-def excel_file_analysis(language):
-    st.write(f"""
-    ### {translate_text(language, "instructions_title")}
+def selection_chunks(selections):
+    # One pass over the selected sheets; only the current chunk is in memory.
+    for uploaded_file, _, _, sheet_name in selections:
+        with open_upload(uploaded_file, SPOOL_THRESHOLD_BYTES) as source:
+            yield from iter_excel_chunks(source, sheet_name, OUT_OF_CORE_CHUNK_ROWS)
+
+@st.cache_data
+def get_out_of_core_preview(dataset_key, _selections):
+    # Parsing the first chunk takes seconds on wide sheets; do it once per
+    # dataset rather than on every widget interaction.
+    chunks = selection_chunks(_selections)
+    first_chunk = next(chunks, None)
+    chunks.close()
+    if first_chunk is None:
+        return None, []
+    return first_chunk.head(), first_chunk.select_dtypes(include=['number']).columns.tolist()
+
+def selection_stats(selections, update):
+    # Several sheets are summarised in parallel on the shared process pool,
+    # each worker streaming its own sheet from a spooled path, and merged in
+    # selection order. One chunk per worker is in memory at a time.
+    start = time.perf_counter()
+    if len(selections) == 1 or LOAD_WORKERS <= 1:
+        stats = ChunkedStats()
+        for chunk in selection_chunks(selections):
+            stats.update(chunk)
+            update(stats.rows, None, time.perf_counter() - start)
+        return stats
+    paths = {}
+    with contextlib.ExitStack() as spools:
+        for uploaded_file, _, file_hash, _ in selections:
+            if file_hash not in paths:
+                paths[file_hash] = spools.enter_context(spool_to_path(uploaded_file))
+        executor = get_process_pool()
+        futures = [executor.submit(sheet_stats, paths[file_hash], sheet_name, OUT_OF_CORE_CHUNK_ROWS)
+                   for _, _, file_hash, sheet_name in selections]
+        stats = ChunkedStats()
+        for future in futures:
+            stats.merge(future.result())
+            update(stats.rows, None, time.perf_counter() - start)
+    return stats
+
+def analyze_out_of_core(selections, language, dataset_key):
+    preview, columns = get_out_of_core_preview(dataset_key, selections)
+    if preview is None:
+        st.error(translate_text(language, "file_empty_error"))
+        return
+    st.write(f"#### {translate_text(language, 'file_read_success')}")
+    st.dataframe(preview)
+    st.caption(translate_text(language, "out_of_core_caption").format(rows=OUT_OF_CORE_CHUNK_ROWS))
+
+    stats_cache = get_chunked_stats_cache()
+    stats = stats_cache.get(dataset_key)
+    if st.button(translate_text(language, "generate_insights")):
+        with profiled(get_profiler(), "chunked stats", sheets=len(selections)) as info:
+            stats = selection_stats(selections, streaming_progress(language))
+            info["rows"] = stats.rows
+        stats_cache.put(dataset_key, stats)
+    if stats is not None:
+        st.write(translate_text(language, "descriptive_statistics"), stats.describe())
+        st.write(translate_text(language, "insights_explanation"))
+        if stats.numeric_columns():
+            st.write(translate_text(language, "correlation_matrix"))
+            st.dataframe(stats.corr())
+        else:
+            st.write(translate_text(language, "no_numeric_columns"))
 
+    st.write(f"### {translate_text(language, 'ml_section_title')}")
+    st.caption(translate_text(language, "out_of_core_ml_caption").format(model=INCREMENTAL_MODELS[0]))
+    # Column types come from the first chunk; non-numeric values met later are reported by training.
+    feature_columns = st.multiselect(translate_text(language, "ml_select_features"), columns)
+    target_column = st.selectbox(translate_text(language, "ml_select_target"), columns)
+    params = model_hyperparameters(INCREMENTAL_MODELS[0], language)
+    epochs = st.number_input(translate_text(language, "ml_epochs"), min_value=1, value=DEFAULT_EPOCHS)
+    if not feature_columns or target_column is None:
+        return
+
+    model_cache = get_model_cache()
+    cache_key = model_cache_key(dataset_key, feature_columns, target_column, INCREMENTAL_MODELS[0], {**params, "epochs": epochs})
+    fitted = model_cache.get(cache_key)
+    if fitted is None and st.button(translate_text(language, "ml_train_button")):
+        progress_bar = st.progress(0.0)
+        try:
+            model, metrics = train_incremental(lambda: selection_chunks(selections), feature_columns, target_column, params,
+                                               epochs=epochs, profiler=get_profiler(),
+                                               progress=lambda done, total: progress_bar.progress(done / total))
+        except ValueError as e:
+            st.error(str(e))
+            return
+        fitted = (model, metrics, export_model(model, feature_columns, target_column, INCREMENTAL_MODELS[0], params, metrics,
+                                                   get_model_secret()))
+        model_cache.put(cache_key, fitted)
+    if fitted is not None:
+        _, metrics, exported = fitted
+        st.write(f"### {translate_text(language, 'ml_model_performance')}")
+        st.write(f"{translate_text(language, 'ml_mse')}: {metrics['mse']}")
+        st.write(f"{translate_text(language, 'ml_r2')}: {metrics['r2']}")
+        st.write(translate_text(language, "ml_performance_explanation"))
+        st.download_button(
+            translate_text(language, "ml_export_model"),
+            exported,
+            file_name="model.joblib",
+            mime="application/octet-stream"
+        )
+
+def excel_file_analysis(language):
+    with st.expander(translate_text(language, "instructions_title")):
+        st.write(f"""
     {translate_text(language, "instruction_1")}
     {translate_text(language, "instruction_2")}
     {translate_text(language, "instruction_3")}
@@ -349,40 +1293,144 @@ def excel_file_analysis(language):
     {translate_text(language, "instruction_6")}
     """)
 
-    st.write(translate_text(language, "ml_instruction"))
+    ingestion_mode = st.sidebar.selectbox(
+        translate_text(language, "ingestion_mode"),
+        options=["auto", "standard", "streaming", "out_of_core"],
+        format_func=lambda mode: translate_text(language, f"ingestion_{mode}")
+    )
+
+    stored_key = choose_stored_dataset(language)
+    uploads = handle_file_upload("Excel", ['xlsx'], language)
+    if uploads:
+        st.write(f"### {translate_text(language, 'file_uploaded')} {', '.join(name for _, name, _ in uploads)}")
+        if ingestion_mode == "auto":
+            streaming = max(uploaded_file.size for uploaded_file, _, _ in uploads) >= STREAMING_THRESHOLD_BYTES
+        else:
+            streaming = ingestion_mode == "streaming"
+
+        sheet_options = []
+        for uploaded_file, file_name, file_hash in uploads:
+            for sheet_name in get_sheet_names(file_hash, uploaded_file):
+                sheet_options.append((uploaded_file, file_name, file_hash, sheet_name))
+        selections = sheet_options[:1]
+        if len(sheet_options) > 1:
+            # Default to the first sheet of every uploaded file.
+            defaults = [i for i, option in enumerate(sheet_options) if i == 0 or option[2] != sheet_options[i - 1][2]]
+            selected = st.multiselect(
+                translate_text(language, "select_sheets"),
+                range(len(sheet_options)),
+                default=defaults,
+                format_func=lambda i: f"{sheet_options[i][1]} / {sheet_options[i][3]}"
+            )
+            selections = [sheet_options[i] for i in selected]
 
-    file_path, file_name = handle_file_upload("Excel", ['xlsx'], language)
-    if file_path:
-        st.write(f"### {translate_text(language, 'file_uploaded')} {file_name}")
-        df = read_excel(file_path, language)
+        dataset_key = dataset_cache_key([sheet_cache_key(file_hash, sheet_name) for _, _, file_hash, sheet_name in selections])
+        if ingestion_mode == "out_of_core":
+            if selections:
+                analyze_out_of_core(selections, language, dataset_key)
+            return
+        store = get_dataset_store()
+        if selections and store and dataset_key in store:
+            df = open_stored_dataset(dataset_key, language)
+        elif len(selections) == 1:
+            uploaded_file, _, file_hash, sheet_name = selections[0]
+            df = read_excel(uploaded_file, language, file_hash, streaming=streaming, sheet_name=sheet_name)
+        elif selections:
+            df, timing_table = read_excel_sheets(selections, language, streaming=streaming)
+            with st.expander(translate_text(language, "sheet_load_times")):
+                st.dataframe(timing_table)
+        else:
+            df = pd.DataFrame()
         if not df.empty:
-            st.write(f"#### {translate_text(language, 'file_read_success')}")
-            st.dataframe(df.head())
-
-            columns = df.columns.tolist()
-            selected_columns = st.multiselect(translate_text(language, "select_columns"), columns, default=columns)
-            
-            if selected_columns:
-                df_selected = df[selected_columns]
-                if st.button(translate_text(language, "generate_insights")):
-                    st.write("Generating insights...")
-                    generate_insights(df_selected, language)
-
-                st.write(f"### {translate_text(language, 'interactive_visualization')}")
-                # Initialize Pygwalker interface and render as HTML in Streamlit
-                walker_html = pyg.walk(df_selected)
-                st.components.v1.html(walker_html.to_html(), height=800, scrolling=True)
-                
-                # Train Machine Learning Model
-                train_ml_model(df_selected, language)
-            else:
-                st.warning(translate_text(language, "select_columns_warning"))
+            if store and not store.save(dataset_key, df, ", ".join(f"{name} / {sheet}" for _, name, _, sheet in selections)):
+                st.caption(translate_text(language, "store_save_failed"))
+            analyze_dataset(df, language, dataset_key)
         else:
             st.error(translate_text(language, "file_empty_error"))
-        os.remove(file_path)
+    elif stored_key:
+        analyze_dataset(open_stored_dataset(stored_key, language), language, stored_key)
     else:
         st.info(translate_text(language, "upload_prompt"))
 
+def render_performance_panel(language):
+    profiler = get_profiler()
+    with st.sidebar.expander(translate_text(language, "perf_panel")):
+        if profiler and profiler.records:
+            table = pd.DataFrame(profiler.records)
+            table["peak_increase_mb"] = pd.to_numeric(table["peak_increase_bytes"]) / (1024 * 1024)
+            st.dataframe(table[["stage", "seconds", "rows", "rows_per_second", "peak_increase_mb"]])
+            st.download_button(translate_text(language, "perf_download_json"), profiler.to_json(), file_name="stages.json", mime="application/json")
+        else:
+            st.caption(translate_text(language, "perf_no_stages"))
+        st.checkbox(translate_text(language, "perf_trace_memory"), key="trace_memory")
+        st.caption(translate_text(language, "perf_memory_caption"))
+        if st.button(translate_text(language, "perf_profile_next")):
+            st.session_state["profile_next"] = True
+        last_profile = st.session_state.get("last_cprofile")
+        if last_profile:
+            st.download_button(translate_text(language, "perf_download_pstats"), last_profile["pstats"], file_name="rerun.pstats")
+            st.text(last_profile["summary"])
+
+def submit_job(language, kind, label, fn, *args, key=None):
+    manager = get_job_manager()
+    owner = session_owner()
+    if key is not None and manager.find_active(owner, key):
+        st.info(translate_text(language, "job_already_running"))
+        return None
+    job = manager.submit(owner, kind, label, fn, *args, key=key)
+    if job is None:
+        st.warning(translate_text(language, "job_limit").format(limit=manager.max_active_per_owner))
+    else:
+        st.info(translate_text(language, "job_submitted").format(id=job.id))
+    return job
+
+def collect_finished_jobs():
+    """Copy results of this session's finished jobs into session state; returns how many were new."""
+    collected = st.session_state.setdefault("collected_jobs", set())
+    results = st.session_state.setdefault("job_results", {})
+    new = 0
+    for job in get_job_manager().jobs(session_owner()):
+        if job.status == "done" and job.id not in collected:
+            collected.add(job.id)
+            results[job.key] = job.result
+            if job.kind == "search":
+                st.session_state["model_search"] = job.result
+            new += 1
+    return new
+
+def job_panel(language, polling=False):
+    # With polling this runs as a fragment every JOB_POLL_SECONDS; a newly
+    # finished job reruns the whole page so that its result is shown, and
+    # that rerun stops the polling once no job is left active.
+    manager = get_job_manager()
+    jobs = manager.jobs(session_owner())
+    if polling and (collect_finished_jobs() or not any(job.active for job in jobs)):
+        st.rerun()
+    with st.expander(translate_text(language, "jobs_panel"), expanded=any(job.active for job in jobs)):
+        if not jobs:
+            st.caption(translate_text(language, "jobs_none"))
+            return
+        for job in reversed(jobs):
+            status = translate_text(language, f"job_status_{job.status}")
+            st.write(f"**#{job.id}** {job.label}: {status} ({job.elapsed:.1f}s)")
+            if job.active:
+                st.progress(job.progress, text=job.message)
+                if st.button(translate_text(language, "job_cancel"), key=f"cancel_job_{job.id}"):
+                    manager.cancel(job.id)
+            elif job.status == "failed":
+                st.error(job.error)
+        if not polling:
+            # Clicking reruns the page, and main() collects finished jobs.
+            st.button(translate_text(language, "job_refresh"))
+
+def render_background_jobs(language):
+    polling = hasattr(st, "fragment") and any(job.active for job in get_job_manager().jobs(session_owner()))
+    with st.sidebar:
+        if polling:
+            st.fragment(job_panel, run_every=JOB_POLL_SECONDS)(language, polling=True)
+        else:
+            job_panel(language)
+
 # Main Function
 def main():
     # Language selection with flags
@@ -419,7 +1467,17 @@ def main():
     st.sidebar.markdown(translate_text(language, "sidebar_instructions"))
 
     st.title(translate_text(language, "title"))
-    excel_file_analysis(language)
+
+    st.session_state["profiler"] = PipelineProfiler(trace_memory=st.session_state.get("trace_memory", False))
+    collect_finished_jobs()
+    if st.session_state.pop("profile_next", False):
+        with cprofile_run() as result:
+            excel_file_analysis(language)
+        st.session_state["last_cprofile"] = result
+    else:
+        excel_file_analysis(language)
+    render_background_jobs(language)
+    render_performance_panel(language)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,115 @@
+"""Run the analysis pipeline over a directory of workbooks without Streamlit.
+
+Example::
+
+    python batch.py reports/ results/ --target revenue --workers 8 --format json parquet
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from modeling import INCREMENTAL_MODELS, MODEL_CHOICES
+from pipeline import analyze_workbook, result_to_json
+
+OUTPUT_FORMATS = ["json", "parquet"]
+
+
+def process_file(path, stem, formats, target_column=None, feature_columns=None,
+                 model_choice="Linear Regression", streaming=False, out_of_core=False):
+    """Analyze one workbook and write its outputs; returns a summary row."""
+    start = time.perf_counter()
+    try:
+        result = analyze_workbook(path, target_column=target_column, feature_columns=feature_columns,
+                                  model_choice=model_choice, streaming=streaming, out_of_core=out_of_core)
+        if "json" in formats:
+            with open(f"{stem}.json", "w", encoding="utf-8") as f:
+                json.dump({"file": str(path), **result_to_json(result)}, f, indent=2)
+        if "parquet" in formats:
+            # Parquet needs string column names, and the statistics of text
+            # columns (count, unique, top, freq) mix numbers and strings.
+            statistics = result["statistics"].rename(columns=str)
+            mixed = statistics.select_dtypes(include=['object']).columns
+            statistics[mixed] = statistics[mixed].astype(str)
+            statistics.to_parquet(f"{stem}.statistics.parquet")
+            if result["correlation"] is not None:
+                result["correlation"].rename(index=str, columns=str).to_parquet(f"{stem}.correlation.parquet")
+    except Exception as e:
+        logging.error(f"Failed to analyze {path}: {e}")
+        return {"file": str(path), "ok": False, "error": str(e), "seconds": time.perf_counter() - start}
+    return {"file": str(path), "ok": True, "rows": result["rows"], "model": result["model"],
+            "seconds": time.perf_counter() - start}
+
+
+def output_stem(path, input_dir, output_dir):
+    relative = Path(path).relative_to(input_dir).with_suffix("")
+    return str(Path(output_dir) / "__".join(relative.parts))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Analyze every .xlsx workbook in a directory.")
+    parser.add_argument("input_dir", help="directory containing .xlsx files (searched recursively)")
+    parser.add_argument("output_dir", help="directory for per-workbook results and summary.json")
+    parser.add_argument("--target", help="numeric target column; enables model training")
+    parser.add_argument("--features", nargs="+", help="feature columns (default: all other numeric columns)")
+    parser.add_argument("--model", choices=MODEL_CHOICES,
+                        help=f"default: {MODEL_CHOICES[0]}, or {INCREMENTAL_MODELS[0]} with --out-of-core")
+    parser.add_argument("--format", nargs="+", choices=OUTPUT_FORMATS, default=["json"], dest="formats")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel worker processes")
+    parser.add_argument("--streaming", action="store_true", help="use the low-memory read-only reader")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="never load a whole sheet: chunked statistics and incremental SGD training")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    paths = sorted(path for path in Path(args.input_dir).rglob("*.xlsx") if not path.name.startswith("~$"))
+    if not paths:
+        logging.error(f"No .xlsx files found in {args.input_dir}")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    summaries = []
+    model_choice = args.model or (INCREMENTAL_MODELS[0] if args.out_of_core else MODEL_CHOICES[0])
+    options = dict(target_column=args.target, feature_columns=args.features, model_choice=model_choice,
+                   streaming=args.streaming, out_of_core=args.out_of_core)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # Outputs are named after the path relative to input_dir, so that
+        # equally named workbooks in different subdirectories do not clash.
+        futures = [
+            executor.submit(process_file, path, output_stem(path, args.input_dir, args.output_dir), args.formats, **options)
+            for path in paths
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            summary = future.result()
+            summaries.append(summary)
+            logging.info(f"[{done}/{len(paths)}] {summary['file']} ({summary['seconds']:.2f}s)")
+    elapsed = time.perf_counter() - start
+
+    succeeded = [summary for summary in summaries if summary["ok"]]
+    rows = sum(summary["rows"] for summary in succeeded)
+    report = {
+        "files": len(paths),
+        "succeeded": len(succeeded),
+        "failed": len(paths) - len(succeeded),
+        "seconds": elapsed,
+        "files_per_second": len(paths) / elapsed if elapsed else None,
+        "rows_per_second": rows / elapsed if elapsed else None,
+        "results": sorted(summaries, key=lambda summary: summary["file"]),
+    }
+    with open(Path(args.output_dir) / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Processed {len(paths)} files ({len(succeeded)} succeeded) in {elapsed:.2f}s: "
+          f"{report['files_per_second']:.2f} files/s, {report['rows_per_second']:.0f} rows/s")
+    return 0 if len(succeeded) == len(paths) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
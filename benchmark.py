@@ -0,0 +1,281 @@
+"""Benchmarks for the app's hot paths on synthetic workbooks.
+
+Generates .xlsx files of configurable shape, times the load, insights,
+visualization and model stages, each in a fresh process so that peak RSS is
+attributable, and appends the results to a JSON history for comparison.
+Cases that work on a loaded frame read it from a Parquet copy made once per
+workbook, and the reported memory is the growth of peak RSS during the timed
+runs, so the workbook parse does not count against them::
+
+    python benchmark.py --rows 10000 100000 1000000 --history benchmarks/history.json
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+BENCHMARKS = [
+    "read_excel",
+    "read_excel_streaming",
+    "load_sheets_parallel",
+    "generate_insights",
+    "pygwalker_html",
+    "train_linear_regression",
+    "train_decision_tree",
+    "chunked_insights",
+    "train_sgd_incremental",
+]
+
+# Benchmarks that stream the workbook instead of loading it first
+STREAMED_BENCHMARKS = ["read_excel", "read_excel_streaming", "load_sheets_parallel", "chunked_insights",
+                       "train_sgd_incremental"]
+
+
+def generate_workbook(path, rows, columns=20, sheets=1, cardinality=50, seed=42):
+    """Write a synthetic workbook with a mix of int, float, string and date columns.
+
+    Columns cycle through the four types; string columns draw from
+    ``cardinality`` distinct values. The last column, ``target``, is a noisy
+    linear function of the numeric columns so that the models have signal.
+    """
+    import openpyxl
+
+    rng = np.random.default_rng(seed)
+    kinds = ["int", "float", "str", "date"]
+    names = [f"{kinds[i % 4]}_{i}" for i in range(columns)] + ["target"]
+    labels = np.array([f"category_{i}" for i in range(cardinality)], dtype=object)
+    base_date = datetime.datetime(2020, 1, 1)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_index in range(sheets):
+        sheet = workbook.create_sheet(f"Sheet{sheet_index + 1}")
+        sheet.append(names)
+        # Generate in blocks to keep the generator's own memory bounded.
+        for block_start in range(0, rows, 50_000):
+            block = min(50_000, rows - block_start)
+            data, target = [], np.zeros(block)
+            for i in range(columns):
+                kind = kinds[i % 4]
+                if kind == "int":
+                    values = rng.integers(0, 1000, block)
+                    target += values * 0.01
+                elif kind == "float":
+                    values = rng.normal(100, 15, block)
+                    target += values * 0.1
+                elif kind == "str":
+                    values = labels[rng.integers(0, cardinality, block)]
+                else:
+                    values = [base_date + datetime.timedelta(days=int(d)) for d in rng.integers(0, 1500, block)]
+                data.append(values.tolist() if isinstance(values, np.ndarray) else values)
+            data.append((target + rng.normal(0, 1, block)).tolist())
+            for row in zip(*data):
+                sheet.append(row)
+    workbook.save(path)
+
+
+def workbook_path(workdir, rows, columns, sheets, cardinality):
+    return Path(workdir) / f"synthetic_r{rows}_c{columns}_s{sheets}_k{cardinality}.xlsx"
+
+
+def _write_setup_frame(path):
+    from pipeline import load_workbook
+
+    load_workbook(path).to_parquet(Path(path).with_suffix(".parquet"))
+
+
+def prepare_setup_frame(path):
+    """Save the loaded, dtype-optimized first sheet as Parquet next to the workbook."""
+    if not Path(path).with_suffix(".parquet").exists():
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            executor.submit(_write_setup_frame, str(path)).result()
+
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _run_case(benchmark, path, repeat):
+    # Executed in a fresh worker process per (workload, benchmark) pair.
+    import pandas as pd
+
+    from chunked import ChunkedStats, chunked_insights
+    from loaders import iter_excel_chunks, list_sheets, load_sheets
+    from modeling import train_and_evaluate, train_incremental
+    from pipeline import compute_insights, load_workbook
+    from visualization import prepare_visualization_frame
+
+    setup = None
+    if benchmark not in STREAMED_BENCHMARKS:
+        setup = pd.read_parquet(Path(path).with_suffix(".parquet"))
+    feature_columns = None
+    if setup is not None:
+        feature_columns = [column for column in setup.select_dtypes(include=['number']).columns if column != "target"]
+    elif benchmark == "train_sgd_incremental":
+        # Column types and row count from an untimed pass.
+        stats = ChunkedStats(sample_size=0)
+        for chunk in iter_excel_chunks(path):
+            stats.update(chunk)
+        feature_columns = [column for column in stats.numeric_columns() if column != "target"]
+
+    def run():
+        # Both loads include optimize_dtypes, as every load in the app does.
+        if benchmark == "read_excel":
+            return len(load_workbook(path))
+        if benchmark == "read_excel_streaming":
+            return len(load_workbook(path, streaming=True))
+        if benchmark == "load_sheets_parallel":
+            # Every sheet on a spawn pool, as the app loads a multi-sheet
+            # selection; the workers' memory is not part of this process' RSS.
+            tasks = [(sheet, path, sheet) for sheet in list_sheets(path)]
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1), mp_context=context) as executor:
+                return sum(len(df) for _, df, _, error in load_sheets(tasks, executor=executor) if error is None)
+        if benchmark == "generate_insights":
+            compute_insights(setup)
+            return len(setup)
+        if benchmark == "chunked_insights":
+            rows = []
+            chunked_insights(iter_excel_chunks(path), progress=rows.append)
+            return rows[-1] if rows else 0
+        if benchmark == "train_sgd_incremental":
+            train_incremental(lambda: iter_excel_chunks(path), feature_columns, "target")
+            return stats.rows
+        if benchmark == "pygwalker_html":
+            import pygwalker as pyg
+            pyg.walk(prepare_visualization_frame(setup)).to_html()
+            return len(setup)
+        model_choice = "Linear Regression" if benchmark == "train_linear_regression" else "Decision Tree Regressor"
+        train_and_evaluate(setup, feature_columns, "target", model_choice)
+        return len(setup)
+
+    # The app imports these once per server, not once per run.
+    if benchmark.startswith("train_"):
+        import sklearn.compose, sklearn.linear_model, sklearn.metrics, sklearn.model_selection, sklearn.tree  # noqa: F401
+    elif benchmark == "pygwalker_html":
+        import pygwalker  # noqa: F401
+    setup_rss = _peak_rss_bytes()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run()
+        timings.append(time.perf_counter() - start)
+    peak_rss = _peak_rss_bytes()
+    return {"rows": rows, "seconds": timings, "peak_rss_bytes": peak_rss,
+            "peak_increase_bytes": peak_rss - setup_rss if peak_rss is not None else None}
+
+
+def run_case(benchmark, path, repeat):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run_case, benchmark, str(path), repeat).result()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def print_comparison(results, previous):
+    baseline = {(r["workload"], r["benchmark"]): r for r in previous["results"]} if previous else {}
+    print(f"{'workload':<38} {'benchmark':<26} {'median s':>10} {'+peak MB':>9} {'vs prev':>8}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['workload']:<38} {result['benchmark']:<26} {'failed: ' + result['error']}")
+            continue
+        before = baseline.get((result["workload"], result["benchmark"]))
+        change = ""
+        if before and "median_seconds" in before and before["median_seconds"]:
+            change = f"{(result['median_seconds'] / before['median_seconds'] - 1) * 100:+.0f}%"
+        peak = f"{result['peak_increase_bytes'] / 1024 / 1024:.0f}" if result.get("peak_increase_bytes") is not None else "-"
+        print(f"{result['workload']:<38} {result['benchmark']:<26} {result['median_seconds']:>10.3f} {peak:>9} {change:>8}")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the Excel analysis hot paths.")
+    parser.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000])
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--sheets", type=int, default=1,
+                        help="sheets per workbook; load_sheets_parallel reads all of them, other cases the first")
+    parser.add_argument("--cardinality", type=int, default=50, help="distinct values per string column")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", default="benchmarks/data", help="where generated workbooks are kept and reused")
+    parser.add_argument("--history", default="benchmarks/history.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for rows in args.rows:
+        path = workbook_path(args.workdir, rows, args.columns, args.sheets, args.cardinality)
+        if not path.exists():
+            print(f"Generating {path} ...", flush=True)
+            generate_workbook(path, rows, args.columns, args.sheets, args.cardinality)
+        if set(args.benchmarks) - set(STREAMED_BENCHMARKS):
+            prepare_setup_frame(path)
+        workload = path.stem
+        for benchmark in args.benchmarks:
+            print(f"Running {benchmark} on {workload} ...", flush=True)
+            try:
+                case = run_case(benchmark, path, args.repeat)
+            except Exception as e:
+                results.append({"workload": workload, "benchmark": benchmark, "error": str(e)})
+                continue
+            results.append({
+                "workload": workload,
+                "benchmark": benchmark,
+                "rows": case["rows"],
+                "median_seconds": statistics.median(case["seconds"]),
+                "min_seconds": min(case["seconds"]),
+                "seconds": case["seconds"],
+                "peak_rss_bytes": case["peak_rss_bytes"],
+                "peak_increase_bytes": case["peak_increase_bytes"],
+            })
+
+    history = load_history(args.history)
+    previous = history[-1] if history else None
+    history.append({
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    })
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    print_comparison(results, previous)
+    return 0 if all("error" not in result for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
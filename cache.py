@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def content_hash(data):
+    """Return a hex SHA-256 digest of a bytes-like object (no copy is made)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sheet_cache_key(file_hash, sheet_name):
+    return content_hash(f"{file_hash}:{sheet_name}".encode("utf-8"))
+
+
+def dataset_cache_key(sheet_keys):
+    """Key identifying the combination of several loaded sheets."""
+    if len(sheet_keys) == 1:
+        return sheet_keys[0]
+    return content_hash("|".join(sheet_keys).encode("utf-8"))
+
+
+def dataframe_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by a total size budget.
+
+    ``sizeof`` maps a value to its cost; entries are evicted oldest first
+    until the total cost fits in ``max_size``. A single value larger than the
+    whole budget is not stored at all.
+    """
+
+    def __init__(self, max_size, sizeof=lambda value: 1):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        cost = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if cost > self.max_size:
+                logging.info(f"Cache entry {key} ({cost}) exceeds budget ({self.max_size}); not cached")
+                return
+            self._entries[key] = (value, cost)
+            self._size += cost
+            while self._size > self.max_size:
+                evicted_key, (_, evicted_cost) = self._entries.popitem(last=False)
+                self._size -= evicted_cost
+                logging.info(f"Cache evicted {evicted_key}")
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value, cost = self._entries.pop(key)
+            self._size -= cost
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class WorkbookCache(LRUCache):
+    """Cache of parsed DataFrames keyed by upload content hash and sheet.
+
+    Frames are kept in memory up to ``max_bytes`` and, when ``spill_dir`` is
+    set, also written to Parquet so that a re-upload after eviction or a
+    server restart can skip the Excel parser entirely. Cached frames are
+    shared between sessions and must not be mutated in place.
+    """
+
+    def __init__(self, max_bytes, spill_dir=None):
+        super().__init__(max_bytes, sizeof=dataframe_nbytes)
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.parquet")
+
+    def get(self, key, default=None):
+        df = super().get(key)
+        if df is not None:
+            return df
+        if self.spill_dir and os.path.exists(self._spill_path(key)):
+            try:
+                df = pd.read_parquet(self._spill_path(key))
+            except Exception as e:
+                logging.warning(f"Could not read spilled frame {key}: {e}")
+                return default
+            logging.info(f"Loaded {key} from disk cache")
+            super().put(key, df)
+            return df
+        return default
+
+    def put(self, key, df):
+        super().put(key, df)
+        if self.spill_dir and not os.path.exists(self._spill_path(key)):
+            # A unique temp name: sessions caching the same workbook at once
+            # must not write to the same file before the atomic replace.
+            fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".parquet.tmp")
+            os.close(fd)
+            try:
+                df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, self._spill_path(key))
+            except Exception as e:
+                # Mixed-type object columns or non-string headers cannot be
+                # written to Parquet; the in-memory entry is still usable.
+                logging.warning(f"Could not spill frame {key} to disk: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
@@ -0,0 +1,206 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from loaders import STREAM_CHUNK_ROWS, iter_excel_chunks
+from sampling import DEFAULT_SAMPLE_ROWS, PERCENTILES
+
+
+class ChunkedStats:
+    """Running ``describe()`` and ``corr()`` of data seen one chunk at a time.
+
+    For every pair of numeric columns it keeps the number of rows where both
+    are present and the sums of x, x² and x·y over those rows, taken relative
+    to a per-column shift (the mean of the column's first chunk) to avoid
+    cancellation. That determines counts, means, standard deviations and the
+    pairwise-complete correlation exactly as pandas computes them, in O(k²)
+    memory for k columns however many rows stream past, and instances built
+    from disjoint rows can be merged. Min and max are exact too; quartiles
+    come from a reservoir sample of ``sample_size`` values per column, so
+    they are exact up to that many values and estimates beyond it.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_ROWS, seed=42):
+        self.sample_size = sample_size
+        self.rows = 0
+        # Every column seen, and those that were not numeric in some chunk
+        self.columns = []
+        self.excluded = set()
+        self._rng = np.random.default_rng(seed)
+        self._names = []
+        self._index = {}
+        self._shift = np.zeros(0)
+        self._n = np.zeros((0, 0))
+        self._s = np.zeros((0, 0))
+        self._q = np.zeros((0, 0))
+        self._p = np.zeros((0, 0))
+        self._min = np.zeros(0)
+        self._max = np.zeros(0)
+        self._samples = []
+
+    def _track(self, names, shifts):
+        old, k = len(self._names), len(self._names) + len(names)
+        for name in names:
+            self._index[name] = len(self._names)
+            self._names.append(name)
+        self._shift = np.concatenate([self._shift, shifts])
+        for attr in ("_n", "_s", "_q", "_p"):
+            grown = np.zeros((k, k))
+            grown[:old, :old] = getattr(self, attr)
+            setattr(self, attr, grown)
+        self._min = np.concatenate([self._min, np.full(len(names), np.inf)])
+        self._max = np.concatenate([self._max, np.full(len(names), -np.inf)])
+        self._samples.extend(np.zeros(0) for _ in names)
+
+    def _offer(self, i, values, seen):
+        # Vectorised Algorithm R: once the sample is full, the t-th value
+        # overall replaces a random slot with probability sample_size / t.
+        sample = self._samples[i]
+        room = self.sample_size - len(sample)
+        if room > 0:
+            sample = np.concatenate([sample, values[:room]])
+            seen += min(room, len(values))
+            values = values[room:]
+        if len(values):
+            slots = self._rng.integers(0, seen + np.arange(1, len(values) + 1))
+            keep = slots < self.sample_size
+            sample[slots[keep]] = values[keep]
+        self._samples[i] = sample
+
+    def _merge_samples(self, a, seen_a, b, seen_b):
+        if seen_a + seen_b <= self.sample_size:
+            return np.concatenate([a, b])
+        # Draw the union's sample from both sides in proportion to the number
+        # of values each one stands for.
+        from_a = min(self._rng.hypergeometric(int(seen_a), int(seen_b), self.sample_size), len(a))
+        from_b = min(self.sample_size - from_a, len(b))
+        return np.concatenate([self._rng.choice(a, from_a, replace=False), self._rng.choice(b, from_b, replace=False)])
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        values = {}
+        for name, column in chunk.items():
+            if name not in self.columns:
+                self.columns.append(name)
+            if name in self.excluded or column.isna().all():
+                continue
+            if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+                values[name] = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                # In one frame a column mixing numbers and text is object.
+                self.excluded.add(name)
+        if not values:
+            return self
+
+        new = [name for name in values if name not in self._index]
+        if new:
+            self._track(new, [np.nanmean(values[name]) for name in new])
+        idx = np.array([self._index[name] for name in values])
+        X = np.column_stack(list(values.values()))
+        present = ~np.isnan(X)
+        seen = np.diag(self._n)[idx].astype(np.int64)
+        for j, i in enumerate(idx):
+            self._offer(i, X[present[:, j], j], seen[j])
+
+        Z = np.where(present, X - self._shift[idx], 0.0)
+        M = present.astype(np.float64)
+        block = np.ix_(idx, idx)
+        self._n[block] += M.T @ M
+        self._s[block] += Z.T @ M
+        self._q[block] += (Z * Z).T @ M
+        self._p[block] += Z.T @ Z
+        self._min[idx] = np.fmin(self._min[idx], np.nanmin(X, axis=0))
+        self._max[idx] = np.fmax(self._max[idx], np.nanmax(X, axis=0))
+        return self
+
+    def merge(self, other):
+        """Add the statistics of ``other``, which must cover different rows."""
+        self.rows += other.rows
+        self.columns.extend(name for name in other.columns if name not in self.columns)
+        self.excluded |= other.excluded
+        new = [name for name in other._names if name not in self._index]
+        if new:
+            self._track(new, other._shift[[other._index[name] for name in new]])
+        if not other._names:
+            return self
+
+        idx = np.array([self._index[name] for name in other._names])
+        seen = np.diag(self._n)[idx].astype(np.int64)
+        for j, i in enumerate(idx):
+            self._samples[i] = self._merge_samples(self._samples[i], seen[j], other._samples[j], int(other._n[j, j]))
+
+        # Re-express other's sums relative to this instance's shifts.
+        d = other._shift - self._shift[idx]
+        n, s = other._n, other._s
+        block = np.ix_(idx, idx)
+        self._n[block] += n
+        self._s[block] += s + d[:, None] * n
+        self._q[block] += other._q + 2 * d[:, None] * s + (d ** 2)[:, None] * n
+        self._p[block] += other._p + d[:, None] * s.T + d[None, :] * s + np.outer(d, d) * n
+        self._min[idx] = np.fmin(self._min[idx], other._min)
+        self._max[idx] = np.fmax(self._max[idx], other._max)
+        return self
+
+    def numeric_columns(self):
+        return [name for name in self._names if name not in self.excluded]
+
+    def describe(self):
+        """Statistics of the numeric columns, shaped like ``DataFrame.describe()``."""
+        names = self.numeric_columns()
+        index = ["count", "mean", "std", "min"] + [f"{p:.0%}" for p in PERCENTILES] + ["max"]
+        if not names:
+            return pd.DataFrame(index=index)
+        idx = [self._index[name] for name in names]
+        n = np.diag(self._n)[idx]
+        s = np.diag(self._s)[idx]
+        q = np.diag(self._q)[idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self._shift[idx] + s / n
+            std = np.sqrt(np.maximum((q - s * s / n) / (n - 1), 0.0))
+        quartiles = np.column_stack([np.quantile(self._samples[i], PERCENTILES) for i in idx])
+        data = np.vstack([n, mean, std, self._min[idx], quartiles, self._max[idx]])
+        return pd.DataFrame(data, index=index, columns=names)
+
+    def corr(self):
+        """Pairwise-complete Pearson correlation, as ``DataFrame.corr()`` computes it."""
+        names = self.numeric_columns()
+        idx = [self._index[name] for name in names]
+        block = np.ix_(idx, idx)
+        n, s, q, p = self._n[block], self._s[block], self._q[block], self._p[block]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # The 1 / (n - 1) factors of covariance and variances cancel.
+            cov = p - s * s.T / n
+            var = q - s * s / n
+            matrix = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+        np.fill_diagonal(matrix, np.where(np.isnan(np.diag(matrix)), np.nan, 1.0))
+        return pd.DataFrame(matrix, index=names, columns=names)
+
+
+def chunked_insights(chunks, progress=None):
+    """Return ``(statistics, correlation)`` like ``pipeline.compute_insights``, from an iterable of chunks.
+
+    ``progress(rows_read)`` is called after every chunk. Correlation is None
+    without numeric columns; columns that are never numeric are left out of
+    the statistics rather than summarised by counts of distinct values.
+    """
+    stats = ChunkedStats()
+    for chunk in chunks:
+        stats.update(chunk)
+        if progress:
+            progress(stats.rows)
+    return stats.describe(), (stats.corr() if stats.numeric_columns() else None)
+
+
+def sheet_stats(source, sheet_name, chunk_rows=STREAM_CHUNK_ROWS):
+    """ChunkedStats of one sheet of a workbook path or raw workbook bytes.
+
+    Module-level so that sheets can be summarised in process pool workers
+    and the results combined with ``ChunkedStats.merge``.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    stats = ChunkedStats()
+    for chunk in iter_excel_chunks(source, sheet_name, chunk_rows):
+        stats.update(chunk)
+    return stats
@@ -0,0 +1,2 @@
+# Makes the top-level modules importable from tests/ when pytest is run from
+# the repository root.
@@ -0,0 +1,127 @@
+import logging
+import threading
+
+import pandas as pd
+
+from cache import LRUCache
+from chunked import ChunkedStats
+
+# Datasets whose statistics are retained by StatsCache
+STATS_CACHE_DATASETS = 16
+
+# Rows per block when a correlation matrix is computed piecewise for a caller
+# that reports progress
+CORR_BLOCK_ROWS = 100_000
+
+
+def describe_columns(df):
+    """The columns ``df.describe()`` reports on: numeric and datetime ones if there are any."""
+    described = df.select_dtypes(include=['number', 'datetime'])
+    return described.columns.tolist() if not described.empty else df.columns.tolist()
+
+
+def _full_corr(numeric_df, progress=None):
+    if progress is None or len(numeric_df) <= CORR_BLOCK_ROWS:
+        return numeric_df.corr()
+    # The same pairwise-complete correlation, accumulated over row blocks so
+    # that progress (and with it cancellation) is reported between them.
+    stats = ChunkedStats()
+    for start in range(0, len(numeric_df), CORR_BLOCK_ROWS):
+        stats.update(numeric_df.iloc[start:start + CORR_BLOCK_ROWS])
+        progress(min(start + CORR_BLOCK_ROWS, len(numeric_df)), len(numeric_df))
+    columns = numeric_df.columns
+    # Columns without any values are not tracked; corr() reports them as NaN.
+    return stats.corr().reindex(index=columns, columns=columns)
+
+
+class StatsCache:
+    """Memo of per-column summaries and correlation entries per dataset.
+
+    Entries are keyed by a dataset content key, so they stay valid for as
+    long as the underlying data does. Changing the column selection only
+    computes statistics for columns not seen before, and the correlation
+    matrix only grows by the rows and columns of the new columns.
+
+    One instance is shared by all sessions and background jobs, so each
+    dataset's entry is updated under its own lock. ``progress(done, total)``,
+    if given, is called between pieces of work; an exception it raises
+    abandons the computation, keeping only the pieces already completed.
+    """
+
+    def __init__(self, max_datasets=STATS_CACHE_DATASETS):
+        self._datasets = LRUCache(max_datasets)
+        self._lock = threading.Lock()
+
+    def _entry(self, dataset_key):
+        with self._lock:
+            entry = self._datasets.get(dataset_key)
+            if entry is None:
+                entry = {"describe": {}, "corr": pd.DataFrame(dtype=float), "lock": threading.Lock()}
+                self._datasets.put(dataset_key, entry)
+            return entry
+
+    def describe(self, df, dataset_key=None, progress=None):
+        columns = describe_columns(df)
+        if not df.columns.is_unique:
+            return df[columns].describe()
+        if dataset_key is None:
+            return self._combine_summaries(self._describe_missing(df, columns, {}, progress), columns)
+        entry = self._entry(dataset_key)
+        with entry["lock"]:
+            selected = self._describe_missing(df, columns, entry["describe"], progress)
+        return self._combine_summaries(selected, columns)
+
+    @staticmethod
+    def _describe_missing(df, columns, summaries, progress):
+        missing = [column for column in columns if column not in summaries]
+        if missing:
+            logging.info(f"Computing descriptive statistics for {len(missing)} new column(s)")
+        for i, column in enumerate(missing):
+            summaries[column] = df[column].describe()
+            if progress:
+                progress(i + 1, len(missing))
+        return [summaries[column] for column in columns]
+
+    @staticmethod
+    def _combine_summaries(selected, columns):
+        # Numeric and datetime columns report different statistics; order
+        # them as describe() does, shortest summaries first.
+        ordered = sorted((summary.index for summary in selected), key=len)
+        index = list(dict.fromkeys(name for names in ordered for name in names))
+        return pd.concat(selected, axis=1, keys=columns).reindex(index)
+
+    def corr(self, df, dataset_key=None, progress=None):
+        numeric_df = df.select_dtypes(include=['number'])
+        columns = numeric_df.columns.tolist()
+        if not numeric_df.columns.is_unique:
+            return numeric_df.corr()
+        if dataset_key is None:
+            return _full_corr(numeric_df, progress)
+        entry = self._entry(dataset_key)
+        with entry["lock"]:
+            return self._grow_corr(entry, numeric_df, columns, progress)
+
+    def _grow_corr(self, entry, numeric_df, columns, progress):
+        matrix = entry["corr"]
+        new = [column for column in columns if column not in matrix.columns]
+        if new:
+            logging.info(f"Computing correlations for {len(new)} new column(s)")
+            if len(new) * 2 >= len(columns):
+                # Mostly new columns: one vectorised pass is cheaper than
+                # growing the cached matrix a column at a time.
+                matrix = _full_corr(numeric_df[columns], progress)
+            else:
+                # Cached columns that are no longer selected are dropped, as
+                # their entries against the new columns are not computed.
+                all_columns = [column for column in matrix.columns if column in numeric_df.columns] + new
+                matrix = matrix.reindex(index=all_columns, columns=all_columns)
+                for i, column in enumerate(new):
+                    # One column against all others is O(n*k), instead of
+                    # O(n*k^2) for recomputing the whole matrix.
+                    row = numeric_df[all_columns].corrwith(numeric_df[column])
+                    matrix.loc[row.index, column] = row
+                    matrix.loc[column, row.index] = row
+                    if progress:
+                        progress(i + 1, len(new))
+            entry["corr"] = matrix
+        return matrix.loc[columns, columns]
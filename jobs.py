@@ -0,0 +1,182 @@
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Finished jobs whose results are kept by a JobManager
+RETAINED_JOBS = 100
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """Handle for one background computation.
+
+    The job function receives the handle as its first argument and should
+    call ``report(progress, message)`` (or ``check()``) between units of work;
+    that is where a requested cancellation takes effect. Work that cannot be
+    split should go through ``run_in_process``.
+    """
+
+    def __init__(self, job_id, owner, kind, label, key=None):
+        self.id = job_id
+        self.owner = owner
+        self.kind = kind
+        self.label = label
+        self.key = key
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATUSES
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def report(self, progress, message=""):
+        self.progress = min(max(progress, 0.0), 1.0)
+        self.message = message
+        self.check()
+
+    def check(self):
+        """Raise JobCancelled if cancellation has been requested."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            # Never started: it will not report, so mark it here.
+            self.status = "cancelled"
+            self.finished = time.time()
+
+
+def _call_and_send(connection, fn, args, kwargs):
+    try:
+        result = (True, fn(*args, **kwargs))
+    except Exception as e:
+        result = (False, e)
+    connection.send(result)
+    connection.close()
+
+
+def run_in_process(job, fn, *args, poll_seconds=0.25, **kwargs):
+    """Return ``fn(*args, **kwargs)`` computed in a child process.
+
+    For a single long call, such as fitting a model, that cannot report
+    progress: the job thread waits for the result and terminates the process
+    as soon as the job is cancelled. ``fn``, its arguments and its result
+    must be picklable.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_call_and_send, args=(sender, fn, args, kwargs), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        while not receiver.poll(poll_seconds):
+            if not process.is_alive() and not receiver.poll():
+                raise RuntimeError(f"Job process exited with code {process.exitcode}")
+            job.check()
+        # Received before joining: a large result would not fit the pipe.
+        ok, value = receiver.recv()
+    except BaseException:
+        process.terminate()
+        raise
+    finally:
+        process.join()
+        receiver.close()
+    if not ok:
+        raise value
+    return value
+
+
+class JobManager:
+    """Runs long computations on a shared thread pool.
+
+    Threads share the in-memory DataFrames without copying them, and pandas,
+    numpy and scikit-learn release the GIL in their heavy loops; only work
+    that must be killable mid-call is copied to a process by
+    ``run_in_process``. Each owner
+    (a browser session) may have at most ``max_active_per_owner`` queued or
+    running jobs, so one user cannot monopolise the pool.
+    """
+
+    def __init__(self, max_workers, max_active_per_owner=2, retain=RETAINED_JOBS):
+        self.max_active_per_owner = max_active_per_owner
+        self.retain = retain
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, owner, kind, label, fn, *args, key=None, **kwargs):
+        """Queue ``fn(job, *args, **kwargs)``; returns the Job, or None at the owner's limit."""
+        with self._lock:
+            if sum(job.active for job in self._jobs.values() if job.owner == owner) >= self.max_active_per_owner:
+                return None
+            job = Job(next(self._ids), owner, kind, label, key)
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.started = time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            logging.exception(f"Background job {job.id} ({job.label}) failed")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+        logging.info(f"Background job {job.id} ({job.label}) {job.status} after {job.elapsed:.2f}s")
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.retain)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self, owner):
+        with self._lock:
+            return [job for job in self._jobs.values() if job.owner == owner]
+
+    def find_active(self, owner, key):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.owner == owner and job.key == key and job.active:
+                    return job
+        return None
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel()
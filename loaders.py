@@ -0,0 +1,401 @@
+import collections
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import re
+import time
+import warnings
+from concurrent.futures import as_completed
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Rows materialised as Python objects at once by the streaming reader
+STREAM_CHUNK_ROWS = 20_000
+
+# Object columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+# Values that look like ISO ("2024-01-31") or day/month ("31/01/2024") dates
+DATE_LIKE = re.compile(r"^\s*(\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})([ T]\d{1,2}:\d{2}(:\d{2})?)?\s*$")
+# Year-first dates, which are read the same way everywhere
+ISO_DATE = re.compile(r"^\s*\d{4}[-/.]")
+
+# Name of the column identifying the originating file and sheet of each row
+SOURCE_COLUMN = "_source"
+
+# Uploads larger than this are spooled to an anonymous temp file
+SPOOL_THRESHOLD_BYTES = 256 * 1024 * 1024
+
+
+@contextlib.contextmanager
+def open_upload(uploaded_file, spool_threshold=SPOOL_THRESHOLD_BYTES):
+    """Yield a seekable binary source over an uploaded file without copying it.
+
+    Streamlit's ``UploadedFile`` is already an in-memory buffer, so small
+    uploads are parsed from it directly. Above ``spool_threshold`` the bytes
+    are written once to an unnamed temporary file that the parser reads
+    through the OS page cache, so the pages can be evicted instead of being
+    pinned in the Python heap. The temp file is removed on exit, even when
+    parsing fails.
+    """
+    size = uploaded_file.size if hasattr(uploaded_file, "size") else len(uploaded_file.getbuffer())
+    if size <= spool_threshold:
+        uploaded_file.seek(0)
+        yield uploaded_file
+        return
+    with tempfile.TemporaryFile() as spool:
+        spool.write(uploaded_file.getbuffer())
+        spool.seek(0)
+        # A file object rather than an mmap: zipfile needs seekable(), which
+        # mmap objects only provide from Python 3.13.
+        logging.info(f"Spooled {size} byte upload to a temp file")
+        yield spool
+
+
+@contextlib.contextmanager
+def spool_to_path(uploaded_file):
+    """Yield the path of a temporary copy of an upload, removed on exit.
+
+    Process pool workers open the workbook from this path themselves, so
+    its bytes are written once instead of being pickled to the pool for
+    every sheet parsed from it.
+    """
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(uploaded_file.getbuffer())
+        yield path
+    finally:
+        os.remove(path)
+
+
+def _header_names(row):
+    # Mirror pandas' reader: blank headers become "Unnamed: i", and duplicates
+    # are suffixed ".1", ".2", ..., skipping suffixed names the header already
+    # has. Named columns are renamed before unnamed ones.
+    names = [f"Unnamed: {i}" if value is None else value for i, value in enumerate(row)]
+    unnamed = [i for i, value in enumerate(row) if value is None]
+    counts = collections.defaultdict(int)
+    for i in [i for i in range(len(names)) if row[i] is not None] + unnamed:
+        name = original = names[i]
+        count = counts[name]
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in names else counts[name]
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _typed_chunk(values):
+    series = pd.Series(values)
+    if series.isna().all():
+        # Like a column that is blank throughout a sheet in pd.read_excel
+        return series.astype(np.float64)
+    # openpyxl returns whole numbers as floats in some workbooks; pandas'
+    # reader turns integral floats back into ints, so do the same per chunk.
+    if series.dtype == np.float64 and not series.isna().any():
+        as_int = series.astype(np.int64)
+        if (as_int == series).all():
+            series = as_int
+    elif series.dtype == object and series.isna().any():
+        if pd.api.types.infer_dtype(series, skipna=True) == "boolean":
+            # pandas' reader gives 1.0 / 0.0 / NaN for booleans with blanks.
+            return series.astype(np.float64)
+        # Mixed columns keep None for blanks; pandas' reader gives NaN.
+        series = series.where(series.notna(), np.nan)
+    return series
+
+
+def _null_chunk(length, dtypes):
+    # An all-blank chunk must not turn a typed column into object on concat.
+    if dtypes and all(pd.api.types.is_datetime64_any_dtype(d) for d in dtypes):
+        return pd.Series(pd.NaT, index=range(length), dtype=dtypes[0])
+    if not dtypes or all(pd.api.types.is_numeric_dtype(d) for d in dtypes):
+        # Including booleans, which become floats once they have blanks
+        return pd.Series(np.nan, index=range(length), dtype=np.float64)
+    if dtypes and all(isinstance(d, pd.StringDtype) and d == dtypes[0] for d in dtypes):
+        # Text on pandas 3
+        return pd.Series(np.nan, index=range(length), dtype=dtypes[0])
+    return pd.Series(np.nan, index=range(length), dtype=object)
+
+
+def _concat_column(chunks):
+    dtypes = [chunk.dtype for chunk in chunks if not isinstance(chunk, int)]
+    parts = [_null_chunk(chunk, dtypes) if isinstance(chunk, int) else chunk for chunk in chunks]
+    if len({pd.api.types.is_bool_dtype(part) for part in parts}) > 1 and all(pd.api.types.is_numeric_dtype(part) for part in parts):
+        # Booleans with blanks in other chunks: 1.0 / 0.0, as in pandas' reader
+        parts = [part.astype(np.float64) for part in parts]
+    if len(parts) == 1:
+        return parts[0].reset_index(drop=True)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _worksheet(workbook, sheet_name):
+    if sheet_name is None or isinstance(sheet_name, int):
+        return workbook.worksheets[sheet_name or 0]
+    return workbook[sheet_name]
+
+
+def _row_batches(rows, batch_rows):
+    """Yield ``(names, rows)`` batches from a values-only row iterator.
+
+    The first row is the header. Like ``pd.read_excel``, blank rows between
+    data rows are kept (as rows of None) and trailing ones are dropped.
+    Every row is padded to the widest row seen so far; rows wider than the header add
+    "Unnamed: i" columns, so ``names`` can grow between batches. A sheet with
+    only a header yields its names with no rows.
+    """
+    header = next(rows, None)
+    if header is None:
+        return
+    names = _header_names(header)
+    n_cols = len(names)
+    buffer, batches, blank_rows = [], 0, 0
+    for row in rows:
+        if all(value is None for value in row):
+            # Held back until a data row shows that they are not trailing.
+            blank_rows += 1
+            continue
+        if len(row) < n_cols:
+            row = row + (None,) * (n_cols - len(row))
+        elif len(row) > n_cols:
+            names.extend(f"Unnamed: {i}" for i in range(n_cols, len(row)))
+            n_cols = len(row)
+            buffer = [r + (None,) * (n_cols - len(r)) for r in buffer]
+        buffer.extend([(None,) * n_cols] * blank_rows)
+        buffer.append(row)
+        blank_rows = 0
+        # Held-back blank rows can fill more than one batch at once.
+        while len(buffer) >= batch_rows:
+            yield names, buffer[:batch_rows]
+            buffer = buffer[batch_rows:]
+            batches += 1
+    if buffer or not batches:
+        yield names, buffer
+
+
+def read_excel_streaming(file, sheet_name=None, chunk_rows=STREAM_CHUNK_ROWS, progress=None):
+    """Read a worksheet with openpyxl's read-only row iterator.
+
+    Rows are collected ``chunk_rows`` at a time and immediately converted into
+    one typed Series per column, so the Python objects of only one chunk are
+    alive at any moment. ``progress(rows_read, total_rows, elapsed_seconds)``
+    is called after every chunk; ``total_rows`` is None when the sheet does
+    not record its dimensions.
+    """
+    start = time.perf_counter()
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    names, columns, rows_read = [], [], 0
+    try:
+        sheet = _worksheet(workbook, sheet_name)
+        total_rows = sheet.max_row - 1 if sheet.max_row else None
+        for names, buffer in _row_batches(sheet.iter_rows(values_only=True), chunk_rows):
+            # Columns first seen in this batch were blank in all earlier rows.
+            columns.extend(([rows_read] if rows_read else []) for _ in range(len(columns), len(names)))
+            for i, values in enumerate(zip(*buffer)):
+                if all(value is None for value in values):
+                    # Store just the length; the dtype is decided at the end.
+                    columns[i].append(len(values))
+                else:
+                    columns[i].append(_typed_chunk(values))
+            rows_read += len(buffer)
+            del buffer
+            if progress:
+                progress(rows_read, total_rows, time.perf_counter() - start)
+    finally:
+        workbook.close()
+
+    data = {}
+    for name, chunks in zip(names, columns):
+        data[name] = _concat_column(chunks) if chunks else pd.Series(dtype=np.float64)
+        chunks.clear()
+    # copy=False keeps the per-column arrays instead of consolidating them
+    # into 2-D blocks, which would briefly double peak memory.
+    df = pd.DataFrame(data, copy=False)
+    elapsed = time.perf_counter() - start
+    if progress:
+        progress(rows_read, total_rows, elapsed)
+    logging.info(f"Streamed {rows_read} rows in {elapsed:.2f}s")
+    return df
+
+
+def iter_excel_chunks(file, sheet_name=None, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield a worksheet as DataFrames of at most ``chunk_rows`` rows.
+
+    Unlike ``read_excel_streaming`` nothing is kept between chunks, so memory
+    is bounded by the chunk size however long the sheet is. Column types are
+    inferred per chunk, and a column added by rows wider than the header only
+    appears from the chunk in which it is first seen.
+    """
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = _worksheet(workbook, sheet_name)
+        for names, buffer in _row_batches(sheet.iter_rows(values_only=True), chunk_rows):
+            if buffer:
+                yield pd.DataFrame({name: _typed_chunk(values) for name, values in zip(names, zip(*buffer))}, copy=False)
+    finally:
+        workbook.close()
+
+
+def list_sheets(source):
+    workbook = openpyxl.load_workbook(source, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def _is_date_like(column):
+    sample = column.dropna().head(100)
+    if sample.empty:
+        return False
+    if all(isinstance(value, (pd.Timestamp, np.datetime64)) or hasattr(value, "isoformat") for value in sample):
+        return True
+    return all(isinstance(value, str) and DATE_LIKE.match(value) for value in sample)
+
+
+def _parse_dates(column):
+    """Datetimes of a date-like column, or None when its dates are ambiguous.
+
+    "01/02/2024" is 2 January in the US and 1 February in most of Europe, so
+    day/month text is parsed both ways. It is kept only if exactly one way
+    reads every value, or both ways agree.
+    """
+    non_null = column.notna().sum()
+    if column.dropna().map(lambda value: not isinstance(value, str) or bool(ISO_DATE.match(value))).all():
+        parsed = pd.to_datetime(column, errors="coerce", format="mixed")
+        return parsed if parsed.notna().sum() == non_null else None
+    readings = []
+    for dayfirst in (False, True):
+        with warnings.catch_warnings():
+            # Raised when the first value rules out the requested order
+            warnings.simplefilter("ignore", UserWarning)
+            parsed = pd.to_datetime(column, errors="coerce", dayfirst=dayfirst)
+        if parsed.notna().sum() == non_null:
+            readings.append(parsed)
+    if len(readings) == 2 and not readings[0].equals(readings[1]):
+        return None
+    return readings[0] if readings else None
+
+
+def _optimize_column(column, category_ratio):
+    if pd.api.types.is_bool_dtype(column):
+        return column
+    if pd.api.types.is_integer_dtype(column):
+        return pd.to_numeric(column, downcast="integer")
+    if pd.api.types.is_float_dtype(column):
+        # Kept at float64 even where float32 would hold every value: pandas
+        # sums float32 columns in float32, which changes means and totals.
+        return column
+    # Text loads as object on pandas 2 and as the "str" dtype on pandas 3.
+    if not (pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column)):
+        return column
+    if _is_date_like(column):
+        parsed = _parse_dates(column)
+        if parsed is not None:
+            return parsed
+    non_null = column.count()
+    if non_null and column.nunique(dropna=True) <= category_ratio * len(column):
+        return column.astype("category")
+    return column
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_RATIO):
+    """Return a memory-compact copy of ``df`` without changing any value.
+
+    Integers are downcast to the smallest signed type, date-like text
+    columns are parsed to datetimes when their day and month order is
+    unambiguous, and repetitive text columns become categoricals. Floats
+    are left alone. The footprints before and after the pass are kept in
+    ``attrs["memory_before"]`` and ``attrs["memory_after"]`` for reporting.
+    """
+    memory_before = int(df.memory_usage(index=True, deep=True).sum())
+    optimized = df.copy(deep=False)
+    for i in range(optimized.shape[1]):
+        optimized.isetitem(i, _optimize_column(df.iloc[:, i], category_ratio))
+    optimized.attrs["memory_before"] = memory_before
+    optimized.attrs["memory_after"] = int(optimized.memory_usage(index=True, deep=True).sum())
+    return optimized
+
+
+def parse_sheet(source, sheet_name, streaming=False):
+    """Parse and optimize one sheet from a workbook path or raw workbook bytes.
+
+    Returns ``(df, seconds)``. Module-level so that it can be shipped to
+    process pool workers.
+    """
+    start = time.perf_counter()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    if streaming:
+        df = read_excel_streaming(source, sheet_name=sheet_name)
+    else:
+        df = pd.read_excel(source, sheet_name=sheet_name, engine='openpyxl')
+    df = optimize_dtypes(df)
+    return df, time.perf_counter() - start
+
+
+def load_sheets(tasks, streaming=False, executor=None):
+    """Parse ``(key, source, sheet_name)`` tasks, yielding results as they finish.
+
+    Sources are workbook paths or bytes; pass paths when using an executor,
+    as bytes are pickled to a worker with every task.
+
+    Each result is ``(key, df, seconds, error)``; a failing sheet yields its
+    exception instead of aborting the others. Without an executor, or for a
+    single task, sheets are parsed in the calling process.
+    """
+    if executor is None or len(tasks) == 1:
+        for key, source, sheet_name in tasks:
+            try:
+                df, seconds = parse_sheet(source, sheet_name, streaming)
+                yield key, df, seconds, None
+            except Exception as e:
+                yield key, None, 0.0, e
+        return
+    futures = {executor.submit(parse_sheet, source, sheet_name, streaming): key for key, source, sheet_name in tasks}
+    for future in as_completed(futures):
+        try:
+            df, seconds = future.result()
+            yield futures[future], df, seconds, None
+        except Exception as e:
+            yield futures[future], None, 0.0, e
+
+
+def _align_categories(frames):
+    # pd.concat only keeps a categorical dtype when every part has the same
+    # categories, so widen each part's categories to their union first.
+    frames = [df.copy(deep=False) for df in frames]
+    shared = set(frames[0].columns)
+    for df in frames[1:]:
+        shared &= set(df.columns)
+    for name in shared:
+        if any(df.columns.tolist().count(name) > 1 for df in frames):
+            continue
+        if not all(isinstance(df[name].dtype, pd.CategoricalDtype) for df in frames):
+            continue
+        try:
+            categories = union_categoricals([df[name] for df in frames]).categories
+        except TypeError:
+            continue
+        for df in frames:
+            df[name] = df[name].cat.set_categories(categories)
+    return frames
+
+
+def combine_frames(frames):
+    """Concatenate ``{label: df}`` into one frame with a categorical source column."""
+    labels = list(frames)
+    combined = pd.concat(_align_categories(list(frames.values())), ignore_index=True)
+    codes = np.repeat(np.arange(len(labels)), [len(frames[label]) for label in labels])
+    combined[SOURCE_COLUMN] = pd.Categorical.from_codes(codes, categories=labels)
+    combined.attrs["memory_before"] = sum(df.attrs.get("memory_before", 0) for df in frames.values())
+    combined.attrs["memory_after"] = int(combined.memory_usage(index=True, deep=True).sum())
+    return combined
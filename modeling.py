@@ -0,0 +1,302 @@
+import hashlib
+import hmac
+import io
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import content_hash
+from profiling import profiled
+
+# scikit-learn and joblib are imported inside the functions that need them:
+# importing them costs seconds, and the app only needs this module's
+# constants until the machine learning section is opened.
+
+MODEL_CHOICES = ["Linear Regression", "Decision Tree Regressor", "SGD Regressor"]
+
+# Models that can be trained out of core with partial_fit
+INCREMENTAL_MODELS = ["SGD Regressor"]
+
+# Passes over the data made by train_incremental
+DEFAULT_EPOCHS = 5
+
+# Exported model files start with this marker and an HMAC-SHA256 of the payload
+ARTIFACT_MAGIC = b"EXCELMODEL1\n"
+
+SEARCH_MODES = ["split", "cv", "grid", "random"]
+
+# Hyperparameter space explored by grid and random search
+SEARCH_SPACES = {
+    "Linear Regression": {"fit_intercept": [True, False]},
+    "Decision Tree Regressor": {
+        "max_depth": [None, 3, 5, 8, 12, 20],
+        "min_samples_split": [2, 10, 50],
+        "min_samples_leaf": [1, 5, 20],
+    },
+    "SGD Regressor": {
+        "alpha": [1e-5, 1e-4, 1e-3, 1e-2],
+        "penalty": ["l2", "l1", "elasticnet"],
+    },
+}
+
+
+def build_pipeline(model_choice, feature_columns, params=None):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LinearRegression, SGDRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.tree import DecisionTreeRegressor
+
+    params = params or {}
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), feature_columns)
+        ])
+    if model_choice == "Linear Regression":
+        regressor = LinearRegression(**params)
+    elif model_choice == "Decision Tree Regressor":
+        regressor = DecisionTreeRegressor(random_state=42, **params)
+    elif model_choice == "SGD Regressor":
+        regressor = SGDRegressor(random_state=42, **params)
+    else:
+        raise ValueError(f"Unknown model: {model_choice}")
+    return Pipeline(steps=[('preprocessor', preprocessor),
+                           ('regressor', regressor)])
+
+
+def model_cache_key(dataset_key, feature_columns, target_column, model_choice, params=None):
+    spec = (dataset_key, tuple(feature_columns), target_column, model_choice, sorted((params or {}).items()))
+    return content_hash(repr(spec).encode("utf-8"))
+
+
+def train_and_evaluate(df, feature_columns, target_column, model_choice, params=None, profiler=None):
+    """Fit a pipeline on an 80/20 split and return it with its test metrics."""
+    from sklearn.metrics import mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    X = df[feature_columns]
+    y = df[target_column]
+    model = build_pipeline(model_choice, feature_columns, params)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    with profiled(profiler, "model fit", rows=len(X_train), model=model_choice):
+        model.fit(X_train, y_train)
+    with profiled(profiler, "model predict", rows=len(X_test), model=model_choice):
+        y_pred = model.predict(X_test)
+    metrics = {"mse": mean_squared_error(y_test, y_pred), "r2": r2_score(y_test, y_pred)}
+    logging.info(f"Trained {model_choice} on {len(X_train)} rows: {metrics}")
+    return model, metrics
+
+
+def _incremental_batches(chunks, feature_columns, target_column, test_fraction, seed):
+    # Yields (features, target, test mask) per chunk; the split depends only
+    # on the chunk's position, so every pass sees the same one.
+    columns = list(feature_columns) + [target_column]
+    for chunk_index, chunk in enumerate(chunks()):
+        chunk = chunk.reindex(columns=columns)
+        for column in columns:
+            if not pd.api.types.is_numeric_dtype(chunk[column]) and chunk[column].notna().any():
+                raise ValueError(f"Column '{column}' must be numeric.")
+        test = np.random.default_rng([seed, chunk_index]).random(len(chunk)) < test_fraction
+        complete = chunk.notna().all(axis=1).to_numpy()
+        chunk = chunk[complete]
+        yield chunk[feature_columns].astype(np.float64), chunk[target_column].to_numpy(dtype=np.float64), test[complete]
+
+
+def train_incremental(chunks, feature_columns, target_column, params=None, epochs=DEFAULT_EPOCHS,
+                      test_fraction=0.2, seed=42, profiler=None, progress=None):
+    """Fit an SGD regressor on data that is only available in chunks.
+
+    ``chunks()`` must start a new pass over the data, returning an iterable
+    of DataFrames. Rows missing a feature or the target are skipped, and
+    each row lands in the test split with probability ``test_fraction``.
+    One pass fits the scaler with ``partial_fit``, ``epochs`` passes train
+    the regressor on shuffled chunks, and a last pass scores the test rows,
+    so memory is bounded by the chunk size. Returns a pipeline that predicts
+    like ``build_pipeline("SGD Regressor", ...)`` and its test metrics;
+    ``progress(passes_done, total_passes)`` is called after every pass.
+    """
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    def batches():
+        return _incremental_batches(chunks, feature_columns, target_column, test_fraction, seed)
+
+    total_passes = epochs + 2
+    scaler = StandardScaler()
+    with profiled(profiler, "model scale", model="SGD Regressor") as info:
+        info["rows"] = 0
+        for X, y, test in batches():
+            if not test.all():
+                scaler.partial_fit(X[~test])
+                info["rows"] += int((~test).sum())
+    if not info["rows"]:
+        raise ValueError("No complete rows to train on.")
+    if progress:
+        progress(1, total_passes)
+
+    regressor = SGDRegressor(random_state=seed, **(params or {}))
+    with profiled(profiler, "model fit", rows=info["rows"] * epochs, model="SGD Regressor", epochs=epochs):
+        for epoch in range(epochs):
+            for chunk_index, (X, y, test) in enumerate(batches()):
+                train = np.flatnonzero(~test)
+                if len(train):
+                    order = np.random.default_rng([seed, epoch, chunk_index]).permutation(train)
+                    regressor.partial_fit(scaler.transform(X.iloc[order]), y[order])
+            if progress:
+                progress(epoch + 2, total_passes)
+
+    # Test metrics from running sums: the target variance is merged chunk by
+    # chunk (Chan et al.) rather than from raw sums of squares.
+    n, mean, m2, sse = 0, 0.0, 0.0, 0.0
+    with profiled(profiler, "model predict", model="SGD Regressor") as info:
+        for X, y, test in batches():
+            if not test.any():
+                continue
+            y_test = y[test]
+            sse += float(((y_test - regressor.predict(scaler.transform(X[test]))) ** 2).sum())
+            count, chunk_mean = len(y_test), float(y_test.mean())
+            delta = chunk_mean - mean
+            m2 += float(((y_test - chunk_mean) ** 2).sum()) + delta ** 2 * n * count / (n + count)
+            mean += delta * count / (n + count)
+            n += count
+        info["rows"] = n
+    if progress:
+        progress(total_passes, total_passes)
+
+    metrics = {"mse": sse / n if n else float("nan"), "r2": 1 - sse / m2 if m2 else float("nan")}
+    logging.info(f"Trained SGD Regressor incrementally over {epochs} epochs: {metrics}")
+    model = Pipeline(steps=[('preprocessor', scaler), ('regressor', regressor)])
+    return model, metrics
+
+
+def export_model(model, feature_columns, target_column, model_choice, params, metrics, secret):
+    """Serialize a fitted pipeline and its metadata with joblib, signed with ``secret``."""
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump({
+        "pipeline": model,
+        "features": list(feature_columns),
+        "target": target_column,
+        "model_choice": model_choice,
+        "params": dict(params or {}),
+        "metrics": dict(metrics),
+    }, buffer)
+    payload = buffer.getvalue()
+    return ARTIFACT_MAGIC + hmac.new(secret, payload, hashlib.sha256).digest() + payload
+
+
+def import_model(data, secret):
+    """Load an artifact written by ``export_model`` with the same ``secret``.
+
+    joblib files are pickles and can execute code when loaded, so the
+    signature is verified before anything is unpickled: only files exported
+    by a server holding the secret are accepted.
+    """
+    import joblib
+
+    data = bytes(data)
+    header = len(ARTIFACT_MAGIC) + hashlib.sha256().digest_size
+    if not data.startswith(ARTIFACT_MAGIC) or len(data) < header:
+        raise ValueError("Not a model exported by this tool")
+    signature, payload = data[len(ARTIFACT_MAGIC):header], data[header:]
+    if not hmac.compare_digest(signature, hmac.new(secret, payload, hashlib.sha256).digest()):
+        raise ValueError("The model's signature does not match this server's key")
+    artifact = joblib.load(io.BytesIO(payload))
+    if not isinstance(artifact, dict) or "pipeline" not in artifact or "features" not in artifact:
+        raise ValueError("Not a model exported by this tool")
+    return artifact
+
+
+def score_frame(artifact, df):
+    """Return ``df`` with a prediction column from an imported model artifact."""
+    missing = [column for column in artifact["features"] if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(map(str, missing))}")
+    scored = df.copy()
+    scored[f"{artifact['target']}_predicted"] = artifact["pipeline"].predict(df[artifact["features"]])
+    return scored
+
+
+def search_candidates(model_choice, mode, params=None, n_iter=10, seed=42):
+    """Hyperparameter sets to evaluate: the given ones, a full grid or a random draw."""
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    if mode == "grid":
+        return list(ParameterGrid(SEARCH_SPACES[model_choice]))
+    if mode == "random":
+        return list(ParameterSampler(SEARCH_SPACES[model_choice], n_iter=n_iter, random_state=seed))
+    return [dict(params or {})]
+
+
+def _fit_and_score_fold(model_choice, params, X, y, train_index, test_index):
+    # Runs in a joblib worker; X and y are plain arrays (memory-mapped by
+    # joblib when large), so the pipeline selects features by position.
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    model = build_pipeline(model_choice, list(range(X.shape[1])), params)
+    start = time.perf_counter()
+    model.fit(X[train_index], y[train_index])
+    fit_seconds = time.perf_counter() - start
+    y_pred = model.predict(X[test_index])
+    return {
+        "mse": mean_squared_error(y[test_index], y_pred),
+        "r2": r2_score(y[test_index], y_pred),
+        "fit_seconds": fit_seconds,
+        "score_seconds": time.perf_counter() - start - fit_seconds,
+    }
+
+
+def cross_validate_candidates(df, feature_columns, target_column, model_choice, candidates,
+                              n_splits=5, n_jobs=-1, patience=0):
+    """Evaluate hyperparameter candidates with k-fold cross-validation.
+
+    The folds of each candidate run in parallel on ``n_jobs`` workers, and
+    one row per finished fold is yielded as soon as it is available, so the
+    caller can display progress live. With ``patience`` > 0 the search stops
+    once that many consecutive candidates failed to improve the best mean R².
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    # joblib rejects n_jobs=0; treat it as running sequentially.
+    n_jobs = n_jobs or 1
+    X = df[feature_columns].to_numpy(dtype=np.float64)
+    y = df[target_column].to_numpy(dtype=np.float64)
+    splits = list(KFold(n_splits=n_splits, shuffle=True, random_state=42).split(X))
+    best_score, since_best = -np.inf, 0
+    with Parallel(n_jobs=n_jobs, return_as="generator") as parallel:
+        for candidate, params in enumerate(candidates):
+            start = time.perf_counter()
+            results = parallel(
+                delayed(_fit_and_score_fold)(model_choice, params, X, y, train_index, test_index)
+                for train_index, test_index in splits
+            )
+            scores = []
+            for fold, result in enumerate(results):
+                scores.append(result["r2"])
+                yield {"candidate": candidate, "params": params, "fold": fold, **result}
+            logging.info(f"Candidate {params}: mean R² {np.mean(scores):.4f} in {time.perf_counter() - start:.2f}s")
+            if np.mean(scores) > best_score:
+                best_score, since_best = np.mean(scores), 0
+            else:
+                since_best += 1
+                if patience and since_best >= patience:
+                    logging.info(f"Early stopping after {candidate + 1} of {len(candidates)} candidates")
+                    return
+
+
+def summarize_folds(fold_rows):
+    """Aggregate fold rows into one line per candidate, best mean R² first."""
+    folds = pd.DataFrame(fold_rows)
+    folds["params"] = folds["params"].map(repr)
+    summary = folds.groupby(["candidate", "params"], sort=False).agg(
+        mean_r2=("r2", "mean"),
+        std_r2=("r2", "std"),
+        mean_mse=("mse", "mean"),
+        fit_seconds=("fit_seconds", "sum"),
+    ).reset_index()
+    return summary.sort_values("mean_r2", ascending=False, ignore_index=True)
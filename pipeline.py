@@ -0,0 +1,159 @@
+"""Streamlit-free ingestion -> insights -> model pipeline.
+
+These functions back both the batch CLI (``batch.py``) and library use, e.g.::
+
+    from pipeline import analyze_workbook
+    result = analyze_workbook("sales.xlsx", target_column="revenue")
+
+With ``out_of_core=True`` the sheet is never loaded as a whole: statistics
+are accumulated chunk by chunk and the model is an SGD regressor trained
+with ``partial_fit``, so memory is bounded by ``chunk_rows``.
+"""
+import json
+import logging
+import time
+
+import pandas as pd
+
+from chunked import ChunkedStats
+from insights import describe_columns
+from loaders import STREAM_CHUNK_ROWS, iter_excel_chunks, optimize_dtypes, read_excel_streaming
+from modeling import DEFAULT_EPOCHS, INCREMENTAL_MODELS, MODEL_CHOICES, train_and_evaluate, train_incremental
+
+
+def load_workbook(source, sheet_name=0, streaming=False, optimize=True):
+    """Read one sheet of an .xlsx path or binary file object into a DataFrame."""
+    if streaming:
+        df = read_excel_streaming(source, sheet_name=sheet_name)
+    else:
+        df = pd.read_excel(source, sheet_name=sheet_name, engine='openpyxl')
+    return optimize_dtypes(df) if optimize else df
+
+
+def compute_insights(df):
+    """Return ``(statistics, correlation)``; correlation is None without numeric columns."""
+    statistics = df[describe_columns(df)].describe()
+    numeric_df = df.select_dtypes(include=['number'])
+    correlation = numeric_df.corr() if not numeric_df.empty else None
+    return statistics, correlation
+
+
+def fit_model(df, target_column, feature_columns=None, model_choice="Linear Regression", params=None):
+    """Train and evaluate a model; features default to every other numeric column."""
+    if not pd.api.types.is_numeric_dtype(df[target_column]):
+        raise ValueError(f"Target column '{target_column}' must be numeric.")
+    if feature_columns is None:
+        feature_columns = [column for column in df.select_dtypes(include=['number']).columns if column != target_column]
+    for column in feature_columns:
+        if not pd.api.types.is_numeric_dtype(df[column]):
+            raise ValueError(f"Feature column '{column}' must be numeric.")
+    if not feature_columns:
+        raise ValueError("No numeric feature columns available.")
+    model, metrics = train_and_evaluate(df, feature_columns, target_column, model_choice, params)
+    return model, {"model_choice": model_choice, "features": list(feature_columns), "target": target_column, **metrics}
+
+
+def fit_model_chunked(chunks, stats, target_column, feature_columns=None, model_choice="SGD Regressor",
+                      params=None, epochs=DEFAULT_EPOCHS):
+    """Out-of-core ``fit_model``; ``stats`` is the ChunkedStats of the data ``chunks()`` streams."""
+    if model_choice not in INCREMENTAL_MODELS:
+        raise ValueError(f"{model_choice} cannot be trained out of core; use one of {', '.join(INCREMENTAL_MODELS)}.")
+    numeric_columns = stats.numeric_columns()
+    if target_column not in numeric_columns:
+        raise ValueError(f"Target column '{target_column}' must be numeric.")
+    if feature_columns is None:
+        feature_columns = [column for column in numeric_columns if column != target_column]
+    for column in feature_columns:
+        if column not in numeric_columns:
+            raise ValueError(f"Feature column '{column}' must be numeric.")
+    if not feature_columns:
+        raise ValueError("No numeric feature columns available.")
+    model, metrics = train_incremental(chunks, feature_columns, target_column, params, epochs=epochs)
+    return model, {"model_choice": model_choice, "features": list(feature_columns), "target": target_column, **metrics}
+
+
+def analyze_workbook_chunked(source, sheet_name=0, target_column=None, feature_columns=None,
+                             model_choice="SGD Regressor", params=None, chunk_rows=STREAM_CHUNK_ROWS,
+                             epochs=DEFAULT_EPOCHS):
+    """``analyze_workbook`` for sheets too large to load; each pass re-reads the workbook."""
+    def chunks():
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return iter_excel_chunks(source, sheet_name, chunk_rows)
+
+    timings = {}
+    start = time.perf_counter()
+    stats = ChunkedStats()
+    for chunk in chunks():
+        stats.update(chunk)
+    statistics = stats.describe()
+    correlation = stats.corr() if stats.numeric_columns() else None
+    timings["insights"] = time.perf_counter() - start
+
+    model_metrics = None
+    if target_column is not None:
+        start = time.perf_counter()
+        _, model_metrics = fit_model_chunked(chunks, stats, target_column, feature_columns, model_choice, params, epochs)
+        timings["model"] = time.perf_counter() - start
+
+    logging.info(f"Analyzed {source} out of core: {stats.rows} rows in {sum(timings.values()):.2f}s")
+    return {
+        "rows": stats.rows,
+        "columns": [str(column) for column in stats.columns],
+        "statistics": statistics,
+        "correlation": correlation,
+        "model": model_metrics,
+        "timings": timings,
+    }
+
+
+def analyze_workbook(source, sheet_name=0, target_column=None, feature_columns=None,
+                     model_choice=None, params=None, streaming=False, out_of_core=False):
+    """Run the whole pipeline on one workbook sheet.
+
+    Returns a dict with the frame shape, the descriptive statistics and
+    correlation matrix (as DataFrames), the model metrics when a target
+    column is given, and timings for each stage. ``model_choice`` defaults
+    to Linear Regression, or to SGD Regressor when out of core.
+    """
+    if out_of_core:
+        return analyze_workbook_chunked(source, sheet_name, target_column, feature_columns,
+                                        model_choice or INCREMENTAL_MODELS[0], params)
+    model_choice = model_choice or MODEL_CHOICES[0]
+    timings = {}
+    start = time.perf_counter()
+    df = load_workbook(source, sheet_name=sheet_name, streaming=streaming)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    statistics, correlation = compute_insights(df)
+    timings["insights"] = time.perf_counter() - start
+
+    model_metrics = None
+    if target_column is not None:
+        start = time.perf_counter()
+        _, model_metrics = fit_model(df, target_column, feature_columns, model_choice, params)
+        timings["model"] = time.perf_counter() - start
+
+    logging.info(f"Analyzed {source}: {len(df)} rows in {sum(timings.values()):.2f}s")
+    return {
+        "rows": len(df),
+        "columns": [str(column) for column in df.columns],
+        "statistics": statistics,
+        "correlation": correlation,
+        "model": model_metrics,
+        "timings": timings,
+    }
+
+
+def result_to_json(result):
+    """Convert an ``analyze_workbook`` result into JSON-serializable data."""
+    def frame(df):
+        # DataFrame.to_json handles NaN and timestamps; round-trip to plain objects.
+        return None if df is None else json.loads(df.to_json(orient="split", date_format="iso"))
+
+    return {
+        **{key: value for key, value in result.items() if key not in ("statistics", "correlation")},
+        "statistics": frame(result["statistics"]),
+        "correlation": frame(result["correlation"]),
+    }
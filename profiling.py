@@ -0,0 +1,152 @@
+import contextlib
+import cProfile
+import io
+import itertools
+import json
+import logging
+import marshal
+import pstats
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Structured per-stage records are emitted on this logger as JSON lines
+profile_logger = logging.getLogger("excel_analysis.profile")
+
+
+def _max_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS, close enough for a gauge)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _HeapTracer:
+    """tracemalloc state shared by every stage that traces memory.
+
+    tracemalloc is process-wide, so it is started by the first traced stage
+    and stopped when the last one ends. Before a new stage resets the peak,
+    the peak so far is folded into the stages already running, so nested
+    and concurrent stages keep their own high-water marks. Allocations of
+    concurrent stages still count towards each other's peaks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._ids = itertools.count()
+        self._started = False
+
+    def begin(self):
+        with self._lock:
+            if not self._spans and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            peak = tracemalloc.get_traced_memory()[1]
+            for span in self._spans.values():
+                span["peak"] = max(span["peak"], peak)
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            span_id = next(self._ids)
+            self._spans[span_id] = {"baseline": current, "peak": current}
+            return span_id
+
+    def end(self, span_id):
+        """Return the stage's peak above its starting heap size."""
+        with self._lock:
+            span = self._spans.pop(span_id)
+            peak = max(span["peak"], tracemalloc.get_traced_memory()[1])
+            if not self._spans and self._started:
+                tracemalloc.stop()
+                self._started = False
+            return peak - span["baseline"]
+
+
+_heap_tracer = _HeapTracer()
+
+
+class PipelineProfiler:
+    """Collects wall time, rows and peak memory for the stages of one run.
+
+    Memory is recorded as the increase of a high-water mark over the stage.
+    With ``trace_memory`` that is the Python heap's peak above its size at
+    the start of the stage (via tracemalloc, which numpy and pandas report
+    to); tracing slows allocations down noticeably, so by default it is the
+    growth of the process' peak RSS during the stage. That growth is zero
+    when the stage stays below an earlier stage's peak. Both measures are
+    process-wide, so stages of other sessions running at the same time add
+    to them.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+
+    def add(self, stage, seconds, rows=None, peak_increase_bytes=None, **details):
+        record = {
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "rows": rows,
+            "rows_per_second": round(rows / seconds, 1) if rows and seconds else None,
+            "peak_increase_bytes": peak_increase_bytes,
+            **details,
+        }
+        self.records.append(record)
+        profile_logger.info(json.dumps(record, default=str))
+        return record
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None, **details):
+        """Time the enclosed block; assign ``info["rows"]`` inside to report rows."""
+        info = {"rows": rows}
+        if self.trace_memory:
+            span = _heap_tracer.begin()
+        else:
+            baseline = _max_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - start
+            if self.trace_memory:
+                peak_increase = _heap_tracer.end(span)
+            else:
+                peak_increase = _max_rss_bytes() - baseline if baseline is not None else None
+            self.add(name, seconds, info["rows"], peak_increase, **details)
+
+    def to_json(self):
+        return json.dumps(self.records, indent=2, default=str)
+
+
+def profiled(profiler, name, rows=None, **details):
+    """``profiler.stage(...)``, or a no-op when no profiler is given."""
+    if profiler is None:
+        return contextlib.nullcontext({"rows": rows})
+    return profiler.stage(name, rows, **details)
+
+
+@contextlib.contextmanager
+def cprofile_run():
+    """Run the enclosed block under cProfile; yields a dict filled on exit.
+
+    ``result["pstats"]`` holds the raw statistics in the format written by
+    ``pstats.Stats.dump_stats`` (readable by pstats, snakeviz or flameprof);
+    ``result["summary"]`` the top functions by cumulative time.
+    """
+    result = {}
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield result
+    finally:
+        profile.disable()
+        profile.create_stats()
+        result["pstats"] = marshal.dumps(profile.stats)
+        summary = io.StringIO()
+        pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(30)
+        result["summary"] = summary.getvalue()
@@ -0,0 +1,91 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Rows kept by the sampled "fast mode"
+DEFAULT_SAMPLE_ROWS = 100_000
+
+# Percentiles reported by approximate_describe, matching DataFrame.describe()
+PERCENTILES = [0.25, 0.5, 0.75]
+
+
+def sample_rows(df, n, seed=42, stratify=None):
+    """Return a uniform random sample of at most ``n`` rows.
+
+    With ``stratify`` the sample is allocated to the groups of that column in
+    proportion to their size (at least one row per group), so that rare
+    categories are not lost. Rows keep their original order.
+    """
+    if len(df) <= n:
+        return df
+    rng = np.random.default_rng(seed)
+    if stratify is None:
+        # Generator.choice samples without materialising a full permutation.
+        positions = rng.choice(len(df), size=n, replace=False)
+    else:
+        fraction = n / len(df)
+        groups = df.groupby(stratify, observed=True, sort=False, dropna=False).indices
+        positions = np.concatenate([
+            rng.choice(members, size=max(1, round(len(members) * fraction)), replace=False)
+            for members in groups.values()
+        ])
+    return df.take(np.sort(positions))
+
+
+def _z(confidence):
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def approximate_describe(sample, population_rows, confidence=0.95):
+    """Estimate ``describe()`` of the population from a sample.
+
+    Returns ``(estimates, lower, upper)`` frames shaped like ``describe()``.
+    Means use a normal interval with finite population correction, standard
+    deviations the large-sample normal approximation, and percentiles a
+    distribution-free interval from the binomial ranks of the order
+    statistics. Min and max are the sample extremes and carry no interval.
+    """
+    z = _z(confidence)
+    numeric = sample.select_dtypes(include=['number'])
+    index = ["count", "mean", "std", "min"] + [f"{p:.0%}" for p in PERCENTILES] + ["max"]
+    estimates = pd.DataFrame(index=index, columns=numeric.columns, dtype=float)
+    lower = estimates.copy()
+    upper = estimates.copy()
+    scale = population_rows / len(sample) if len(sample) else 0.0
+    for column in numeric.columns:
+        values = np.sort(numeric[column].dropna().to_numpy(dtype=np.float64))
+        n = len(values)
+        if n == 0:
+            continue
+        share = n / len(sample)
+        count_margin = z * math.sqrt(share * (1 - share) / len(sample)) * population_rows
+        estimates.loc["count", column] = n * scale
+        lower.loc["count", column] = max(n * scale - count_margin, n)
+        upper.loc["count", column] = min(n * scale + count_margin, population_rows)
+
+        mean, std = values.mean(), values.std(ddof=1) if n > 1 else 0.0
+        fpc = math.sqrt(max(0.0, 1 - n / max(population_rows * share, n)))
+        mean_margin = z * std / math.sqrt(n) * fpc
+        estimates.loc["mean", column], lower.loc["mean", column], upper.loc["mean", column] = mean, mean - mean_margin, mean + mean_margin
+        std_margin = z * std / math.sqrt(2 * (n - 1)) if n > 1 else 0.0
+        estimates.loc["std", column], lower.loc["std", column], upper.loc["std", column] = std, max(std - std_margin, 0.0), std + std_margin
+
+        estimates.loc["min", column] = values[0]
+        estimates.loc["max", column] = values[-1]
+        for p, label in zip(PERCENTILES, index[4:-1]):
+            estimates.loc[label, column] = np.quantile(values, p)
+            spread = z * math.sqrt(n * p * (1 - p))
+            lower.loc[label, column] = values[max(int(math.floor(n * p - spread)), 0)]
+            upper.loc[label, column] = values[min(int(math.ceil(n * p + spread)), n - 1)]
+    return estimates, lower, upper
+
+
+def correlation_interval(corr_matrix, n, confidence=0.95):
+    """Fisher z-transform confidence bounds for a correlation matrix."""
+    if n <= 3:
+        return corr_matrix.copy(), corr_matrix.copy()
+    margin = _z(confidence) / math.sqrt(n - 3)
+    transformed = np.arctanh(corr_matrix.clip(-0.999999, 0.999999))
+    return np.tanh(transformed - margin), np.tanh(transformed + margin)
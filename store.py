@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+CATALOG_FILE = "catalog.json"
+
+
+class DatasetStore:
+    """Local catalog of loaded datasets saved as uncompressed Arrow IPC files.
+
+    Files are opened through a memory map, so numeric columns reference the
+    OS page cache instead of private copies; every session (and process)
+    opening the same dataset shares those pages. Datasets are addressed by
+    the same content keys as the workbook cache. With ``max_bytes`` the
+    least recently opened datasets are deleted once the store outgrows it.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Keys whose frames Arrow cannot hold, so that reruns do not retry them
+        self._unstorable = set()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.arrow")
+
+    def _read_catalog(self):
+        try:
+            with open(os.path.join(self.root, CATALOG_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logging.warning(f"Ignoring unreadable dataset catalog: {e}")
+            return {}
+
+    def _write_catalog(self, catalog):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".json.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.root, CATALOG_FILE))
+
+    def _evict(self, catalog, keep):
+        # Called with the lock held; drops the least recently opened entries.
+        total = sum(entry["bytes"] for entry in catalog.values())
+        for key, entry in sorted(catalog.items(), key=lambda item: item[1]["last_opened"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            del catalog[key]
+            total -= entry["bytes"]
+            if key in self:
+                os.remove(self._path(key))
+            logging.info(f"Evicted stored dataset {entry['name']} ({key}) to stay within the store budget")
+
+    def catalog(self):
+        """Catalog entries, most recently opened first."""
+        entries = [dict(entry, key=key) for key, entry in self._read_catalog().items() if os.path.exists(self._path(key))]
+        return sorted(entries, key=lambda entry: entry["last_opened"], reverse=True)
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def save(self, key, df, name):
+        """Persist ``df`` under ``key``; returns False if it cannot be stored as Arrow.
+
+        A key that failed once is not attempted again by this instance.
+        """
+        if key in self:
+            return True
+        if key in self._unstorable:
+            return False
+        # A unique temp name, so that sessions saving the same workbook at
+        # once do not write to the same file before the atomic replace.
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".arrow.tmp")
+        os.close(fd)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            # Uncompressed so that the file can be memory-mapped without decoding.
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, self._path(key))
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            # Mixed-type object columns and duplicate names have no Arrow equivalent.
+            logging.warning(f"Could not store dataset {name}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._unstorable.add(key)
+            return False
+        with self._lock:
+            catalog = self._read_catalog()
+            now = time.time()
+            catalog[key] = {
+                "name": name,
+                "rows": len(df),
+                "columns": df.shape[1],
+                "bytes": os.path.getsize(self._path(key)),
+                "memory_before": df.attrs.get("memory_before"),
+                "created": now,
+                "last_opened": now,
+            }
+            if self.max_bytes:
+                self._evict(catalog, keep=key)
+            self._write_catalog(catalog)
+        logging.info(f"Stored dataset {name} as {key}")
+        return True
+
+    def load(self, key):
+        """Open a stored dataset as a DataFrame backed by a memory map."""
+        with pa.memory_map(self._path(key), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        # split_blocks avoids consolidating columns into new 2-D blocks, which
+        # lets null-free numeric columns stay views of the mapped file.
+        df = table.to_pandas(split_blocks=True)
+        with self._lock:
+            catalog = self._read_catalog()
+            if key in catalog:
+                catalog[key]["last_opened"] = time.time()
+                self._write_catalog(catalog)
+                if catalog[key].get("memory_before"):
+                    df.attrs["memory_before"] = catalog[key]["memory_before"]
+        return df
+
+    def delete(self, key):
+        with self._lock:
+            catalog = self._read_catalog()
+            catalog.pop(key, None)
+            self._write_catalog(catalog)
+        if key in self:
+            os.remove(self._path(key))
@@ -0,0 +1,165 @@
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from chunked import ChunkedStats, chunked_insights, sheet_stats
+from loaders import iter_excel_chunks
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(1)
+    n = 1000
+    frame = pd.DataFrame({
+        "big": 1e4 + rng.normal(size=n),
+        "linked": np.arange(n, dtype=np.float64),
+        "count": rng.integers(0, 50, n),
+        "sparse": rng.normal(size=n),
+        "mixed": rng.normal(size=n).astype(object),
+        "label": rng.choice(["a", "b", "c"], n),
+    })
+    frame["linked"] += 3 * frame["big"]
+    frame.loc[rng.random(n) < 0.3, "sparse"] = np.nan
+    frame.loc[rng.random(n) < 0.1, "big"] = np.nan
+    frame.loc[500, "mixed"] = "text"
+    return frame
+
+
+def chunks_of(frame, size):
+    return [frame.iloc[start:start + size] for start in range(0, len(frame), size)]
+
+
+def numeric(frame):
+    return frame[["big", "linked", "count", "sparse"]]
+
+
+def assert_matches(stats, frame):
+    expected = numeric(frame)
+    pd.testing.assert_frame_equal(stats.describe(), expected.describe(), check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(stats.corr(), expected.corr(), rtol=1e-9)
+
+
+@pytest.mark.parametrize("size", [1, 7, 250, 1000])
+def test_update_matches_pandas(df, size):
+    stats = ChunkedStats()
+    for chunk in chunks_of(df, size):
+        stats.update(chunk)
+    assert stats.rows == len(df)
+    assert stats.columns == df.columns.tolist()
+    assert stats.excluded == {"mixed", "label"}
+    assert_matches(stats, df)
+
+
+def test_columns_appearing_in_later_chunks(df):
+    stats = ChunkedStats()
+    stats.update(df.iloc[:300][["big", "count"]])
+    stats.update(df.iloc[300:600][["big", "count", "linked"]])
+    # "sparse" is blank throughout this chunk, so it is tracked from the next.
+    stats.update(df.iloc[600:800].assign(sparse=np.nan))
+    stats.update(df.iloc[800:])
+
+    # Columns are reported in the order they were first seen.
+    expected = numeric(df)[["big", "count", "linked", "sparse"]].copy()
+    expected.loc[:299, "linked"] = np.nan
+    expected.loc[:799, "sparse"] = np.nan
+    pd.testing.assert_frame_equal(stats.describe(), expected.describe(), check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(stats.corr(), expected.corr(), rtol=1e-9)
+
+
+def test_merge_matches_pandas(df):
+    left = ChunkedStats()
+    for chunk in chunks_of(df.iloc[:400], 100):
+        left.update(chunk)
+    # Different columns in a different order, and shifts from different data
+    right = ChunkedStats()
+    for chunk in chunks_of(df.iloc[400:][["sparse", "count", "linked", "big"]], 150):
+        right.update(chunk)
+
+    merged = left.merge(right)
+    assert merged.rows == len(df)
+    assert merged.excluded == {"mixed", "label"}
+    assert_matches(merged, df)
+
+
+def test_large_offsets_do_not_cancel():
+    # Values near 1e9 with unit spread lose about half their digits in naive
+    # sums, and pandas itself only agrees to about 1e-5 on them. Subtracting
+    # the offset is exact here, and correlation does not depend on it.
+    rng = np.random.default_rng(3)
+    centered = pd.DataFrame(rng.normal(size=(2000, 3)), columns=["x", "y", "z"])
+    centered["y"] += 0.01 * centered["x"]
+    offset = pd.Series({"x": 1e9, "y": -1e9, "z": 1e8})
+    stats = ChunkedStats()
+    for chunk in chunks_of(centered + offset, 300):
+        stats.update(chunk)
+
+    pd.testing.assert_frame_equal(stats.corr(), centered.corr(), rtol=1e-9)
+    described = stats.describe()
+    pd.testing.assert_series_equal(described.loc["std"], centered.std(), rtol=1e-6, check_names=False)
+    pd.testing.assert_series_equal(described.loc["mean"] - offset, centered.mean(), atol=1e-6, check_names=False)
+
+
+def test_quartiles_are_estimated_beyond_the_sample():
+    values = pd.DataFrame({"x": np.random.default_rng(2).uniform(0, 100, 20000)})
+    stats = ChunkedStats(sample_size=2000)
+    for chunk in chunks_of(values, 3000):
+        stats.update(chunk)
+    described = stats.describe()["x"]
+    assert described["count"] == 20000
+    assert described["min"] == values["x"].min() and described["max"] == values["x"].max()
+    for label, expected in zip(["25%", "50%", "75%"], [25, 50, 75]):
+        assert described[label] == pytest.approx(expected, abs=5)
+
+
+def test_chunked_insights_of_workbook(df):
+    workbook = Workbook()
+    sheet = workbook.active
+    frame = df[["big", "linked", "count", "sparse", "label"]].head(200)
+    sheet.append(frame.columns.tolist())
+    for row in frame.itertuples(index=False):
+        sheet.append([None if pd.isna(value) else value for value in row])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    reported = []
+    statistics, correlation = chunked_insights(iter_excel_chunks(io.BytesIO(buffer.getvalue()), chunk_rows=64), reported.append)
+    assert reported == [64, 128, 192, 200]
+    pd.testing.assert_frame_equal(statistics, numeric(frame).describe(), check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(correlation, numeric(frame).corr(), rtol=1e-9)
+
+
+def test_without_numeric_columns():
+    statistics, correlation = chunked_insights([pd.DataFrame({"label": ["a", "b"]})])
+    assert statistics.empty
+    assert correlation is None
+
+
+def test_sheet_stats_merged_across_workers(df, tmp_path):
+    frame = df[["big", "linked", "count", "sparse"]]
+    path = tmp_path / "book.xlsx"
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, part in (("first", frame.iloc[:300]), ("second", frame.iloc[300:700][["sparse", "count", "linked", "big"]])):
+        sheet = workbook.create_sheet(name)
+        sheet.append(part.columns.tolist())
+        for row in part.itertuples(index=False):
+            sheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(path)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        futures = [executor.submit(sheet_stats, str(path), name, 64) for name in ("first", "second")]
+        stats = ChunkedStats()
+        for future in futures:
+            stats.merge(future.result())
+    expected = frame.iloc[:700]
+    assert stats.rows == 700
+    pd.testing.assert_frame_equal(stats.describe(), expected.describe(), check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(stats.corr(), expected.corr(), rtol=1e-9)
+    # Raw workbook bytes work too.
+    assert sheet_stats(path.read_bytes(), "second").rows == 400
@@ -0,0 +1,137 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from insights import StatsCache
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(300, 8)), columns=list("abcdefgh"))
+    frame["b"] += 2 * frame["a"]
+    frame.loc[rng.choice(300, 40, replace=False), "c"] = np.nan
+    frame["label"] = rng.choice(["x", "y"], 300)
+    frame["when"] = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 900, 300), unit="D")
+    frame.loc[rng.choice(300, 20, replace=False), "when"] = pd.NaT
+    return frame
+
+
+def assert_corr_matches(cache, df, columns, key="data"):
+    result = cache.corr(df[columns], dataset_key=key)
+    expected = df[columns].select_dtypes(include=["number"]).corr()
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-12)
+
+
+def test_corr_grows_by_few_new_columns(df):
+    # Adding fewer columns than half the selection takes the corrwith path.
+    cache = StatsCache()
+    assert_corr_matches(cache, df, list("abcdef"))
+    assert_corr_matches(cache, df, list("abcdefgh"))
+    assert list(cache._entry("data")["corr"].columns) == list("abcdefgh")
+
+
+def test_corr_grows_by_many_new_columns(df):
+    cache = StatsCache()
+    assert_corr_matches(cache, df, ["a", "b"])
+    assert_corr_matches(cache, df, list("abcdefgh") + ["label"])
+
+
+def test_corr_after_dropping_and_reordering_columns(df):
+    cache = StatsCache()
+    assert_corr_matches(cache, df, list("abcdefg"))
+    assert_corr_matches(cache, df, ["g", "c", "a"])
+    # "h" is new while "b", "d", "e" and "f" are cached but unselected.
+    assert_corr_matches(cache, df, ["g", "c", "a", "h"])
+    assert_corr_matches(cache, df, list("hgfedcba"))
+
+
+def test_corr_is_kept_per_dataset(df):
+    cache = StatsCache()
+    other = df[list("abcd")] * 2 + 1
+    assert_corr_matches(cache, df, list("abcd"), key="one")
+    assert_corr_matches(cache, other.assign(e=-df["a"]), list("abcde"), key="two")
+    assert_corr_matches(cache, df, list("abcde"), key="one")
+
+
+def test_describe_matches_pandas(df):
+    cache = StatsCache()
+    # Like describe(), datetime columns are summarised alongside numeric ones.
+    for columns in (["a", "c"], ["when"], list("abcdefgh"), ["h", "c", "label", "when"], ["when", "a"]):
+        result = cache.describe(df[columns], dataset_key="data")
+        pd.testing.assert_frame_equal(result, df[columns].describe())
+    text = df[["label"]]
+    pd.testing.assert_frame_equal(cache.describe(text, dataset_key="data"), text.describe())
+
+
+
+class InterleavingEntry(dict):
+    """Cache entry that runs another selection as soon as a matrix is stored."""
+
+    def __init__(self, entry, other):
+        super().__init__(entry)
+        self.other = other
+        self.threads = []
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key == "corr" and not self.threads:
+            thread = threading.Thread(target=self.other)
+            self.threads.append(thread)
+            thread.start()
+            # Long enough for an unsynchronised run to replace the matrix
+            thread.join(timeout=0.5)
+
+
+def test_concurrent_selection_does_not_replace_matrix_being_read(df):
+    cache = StatsCache()
+    results = []
+    entry = InterleavingEntry(
+        cache._entry("data"),
+        lambda: results.append(cache.corr(df[["g", "h"]], dataset_key="data")),
+    )
+    cache._datasets.put("data", entry)
+
+    assert_corr_matches(cache, df, list("abcd"))
+    entry.threads[0].join()
+    pd.testing.assert_frame_equal(results[0], df[["g", "h"]].corr())
+
+
+class Stop(Exception):
+    pass
+
+
+def test_progress_pieces_match_pandas(df, monkeypatch):
+    monkeypatch.setattr("insights.CORR_BLOCK_ROWS", 70)
+    df = df.drop(columns="label").assign(empty=np.nan)
+    numeric_df = df.select_dtypes(include=["number"])
+    calls = []
+    cache = StatsCache()
+
+    result = cache.corr(df, dataset_key="data", progress=lambda done, total: calls.append((done, total)))
+    pd.testing.assert_frame_equal(result, numeric_df.corr(), rtol=1e-9)
+    assert calls == [(70, 300), (140, 300), (210, 300), (280, 300), (300, 300)]
+
+    calls.clear()
+    result = cache.describe(df, dataset_key="data", progress=lambda done, total: calls.append((done, total)))
+    pd.testing.assert_frame_equal(result, df.describe())
+    assert calls == [(i, df.shape[1]) for i in range(1, df.shape[1] + 1)]
+    pd.testing.assert_frame_equal(cache.corr(df, progress=lambda done, total: None), numeric_df.corr(), rtol=1e-9)
+
+
+def test_abandoned_computation_is_not_cached(df, monkeypatch):
+    monkeypatch.setattr("insights.CORR_BLOCK_ROWS", 70)
+
+    def stop(done, total):
+        if done > 70:
+            raise Stop()
+
+    cache = StatsCache()
+    with pytest.raises(Stop):
+        cache.corr(df[list("abcd")], dataset_key="data", progress=stop)
+    with pytest.raises(Stop):
+        cache.describe(df[list("abcd")], dataset_key="data", progress=lambda done, total: stop(done * 70, total))
+    assert_corr_matches(cache, df, list("abcdefgh"))
+    pd.testing.assert_frame_equal(cache.describe(df[list("abcd")], dataset_key="data"), df[list("abcd")].describe())
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from jobs import JobCancelled, JobManager, run_in_process
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def blocking(job, release):
+    while not release.wait(0.01):
+        job.check()
+    return "done"
+
+
+def test_per_owner_limit():
+    manager = JobManager(max_workers=4, max_active_per_owner=2)
+    release = threading.Event()
+    first = manager.submit("alice", "test", "first", blocking, release)
+    second = manager.submit("alice", "test", "second", blocking, release)
+    assert manager.submit("alice", "test", "third", blocking, release) is None
+    # Other owners have their own allowance.
+    other = manager.submit("bob", "test", "other", blocking, release)
+    assert other is not None
+
+    release.set()
+    wait_for(lambda: not any(job.active for job in (first, second, other)))
+    assert [job.result for job in manager.jobs("alice")] == ["done", "done"]
+    assert manager.submit("alice", "test", "fourth", blocking, release) is not None
+
+
+def test_cancel_queued_and_running_jobs():
+    manager = JobManager(max_workers=1, max_active_per_owner=3)
+    release = threading.Event()
+    running = manager.submit("alice", "test", "running", blocking, release)
+    queued = manager.submit("alice", "test", "queued", blocking, release)
+    wait_for(lambda: running.status == "running")
+
+    manager.cancel(queued.id)
+    assert queued.status == "cancelled"
+    manager.cancel(running.id)
+    wait_for(lambda: not running.active)
+    assert running.status == "cancelled"
+    assert manager.find_active("alice", None) is None
+
+
+def test_failed_job_keeps_error():
+    def failing(job):
+        raise ValueError("bad input")
+
+    manager = JobManager(max_workers=1)
+    job = manager.submit("alice", "test", "failing", failing)
+    wait_for(lambda: not job.active)
+    assert (job.status, job.error) == ("failed", "bad input")
+
+
+def test_finished_jobs_are_pruned():
+    manager = JobManager(max_workers=1, max_active_per_owner=10, retain=3)
+    jobs = []
+    for i in range(6):
+        jobs.append(manager.submit("alice", "test", str(i), lambda job, i=i: i))
+        wait_for(lambda: not jobs[-1].active)
+    release = threading.Event()
+    active = manager.submit("alice", "test", "active", blocking, release)
+    # Pruning happens on submit and keeps the newest finished jobs.
+    assert [job.label for job in manager.jobs("alice")] == ["3", "4", "5", "active"]
+    release.set()
+    wait_for(lambda: not active.active)
+
+
+def test_run_in_process_returns_result_and_raises_errors():
+    manager = JobManager(max_workers=1)
+    job = manager.submit("alice", "test", "sum", lambda job: run_in_process(job, sum, [1, 2, 3]))
+    failing = manager.submit("alice", "test", "int", lambda job: run_in_process(job, int, "not a number"))
+    wait_for(lambda: not job.active and not failing.active, timeout=60)
+    assert job.result == 6
+    assert failing.status == "failed" and "not a number" in failing.error
+
+
+def test_cancel_terminates_process():
+    manager = JobManager(max_workers=1)
+    job = manager.submit("alice", "test", "sleep", lambda job: run_in_process(job, time.sleep, 60))
+    wait_for(lambda: job.status == "running")
+    time.sleep(0.5)
+    started = time.time()
+    manager.cancel(job.id)
+    wait_for(lambda: not job.active, timeout=10)
+    assert job.status == "cancelled"
+    assert time.time() - started < 5
+
+
+def test_check_raises_once_cancelled():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    job = manager.submit("alice", "test", "running", blocking, release)
+    wait_for(lambda: job.status == "running")
+    job.cancel()
+    with pytest.raises(JobCancelled):
+        job.check()
+    wait_for(lambda: not job.active)
@@ -0,0 +1,125 @@
+import io
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from loaders import iter_excel_chunks, optimize_dtypes, read_excel_streaming
+
+
+def workbook_bytes(rows, sheet_name="Sheet1"):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = sheet_name
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+ROWS = [
+    # Duplicate names are suffixed around the existing "id.1", as pandas does.
+    ["id", "amount", "label", "when", "mixed", "flag", "always", "id", "id.1"],
+    [1, 1.5, "a", datetime(2024, 1, 1), 3, True, True, 10, 20],
+    [2, None, "b", datetime(2024, 1, 2), "x", False, False, 11, 21],
+    [],
+    [],
+    [3, 2.25, None, None, 4.5, True, True, 12, 22],
+    [4, -7.0, "a", datetime(2024, 1, 4), None, None, False, 13, 23, "extra"],
+    [5, 0.0, "c", datetime(2024, 1, 5), True, False, True, 14, 24],
+    [],
+    [],
+]
+
+
+def expected(data, sheet_name=0):
+    return pd.read_excel(io.BytesIO(data), sheet_name=sheet_name, engine="openpyxl")
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 100])
+def test_streaming_matches_read_excel(chunk_rows):
+    data = workbook_bytes(ROWS)
+    df = read_excel_streaming(io.BytesIO(data), chunk_rows=chunk_rows)
+    pd.testing.assert_frame_equal(df, expected(data), check_dtype=False)
+    assert list(df.columns) == ["id", "amount", "label", "when", "mixed", "flag", "always", "id.2", "id.1", "Unnamed: 9"]
+    # Booleans with blanks are read as 1.0 / 0.0 / NaN.
+    assert df["flag"].dtype == df["always"].dtype == expected(data)["flag"].dtype == np.float64
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 100])
+def test_chunks_concatenate_to_read_excel(chunk_rows):
+    data = workbook_bytes(ROWS)
+    chunks = list(iter_excel_chunks(io.BytesIO(data), chunk_rows=chunk_rows))
+    assert all(len(chunk) <= chunk_rows for chunk in chunks)
+    # Types are inferred per chunk, so a chunk where a column is blank
+    # throughout holds floats.
+    df = pd.concat(chunks, ignore_index=True).infer_objects()
+    pd.testing.assert_frame_equal(df, expected(data), check_dtype=False)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 100])
+def test_streaming_keeps_booleans_without_blanks(chunk_rows):
+    data = workbook_bytes([["flag", "sometimes"], [True, True], [False, None], [True, False]])
+    df = read_excel_streaming(io.BytesIO(data), chunk_rows=chunk_rows)
+    pd.testing.assert_frame_equal(df, expected(data))
+    assert df.dtypes.tolist() == [bool, np.float64]
+
+
+def test_streaming_selects_sheet_by_name():
+    workbook = Workbook()
+    workbook.active.append(["ignored"])
+    second = workbook.create_sheet("Data")
+    for row in [["x", "y"], [1, 2.0], [], [3, np.nan]]:
+        second.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    data = buffer.getvalue()
+
+    df = read_excel_streaming(io.BytesIO(data), sheet_name="Data", chunk_rows=2)
+    pd.testing.assert_frame_equal(df, expected(data, "Data"), check_dtype=False)
+
+
+def test_optimize_dtypes_compacts_without_changing_values():
+    df = pd.DataFrame({
+        "small": np.arange(200, dtype=np.int64),
+        "exact": np.linspace(0, 1, 200).astype(np.float32).astype(np.float64),
+        "precise": np.linspace(0, 1, 200) / 3,
+        "city": ["Berlin", "Cairo", None, "Lima"] * 50,
+        "day": [f"2024-01-{i % 28 + 1:02d}" for i in range(200)],
+        "free": [f"note {i}" for i in range(200)],
+    })
+    optimized = optimize_dtypes(df)
+
+    assert optimized["small"].dtype == np.int16
+    # float32 would hold these, but pandas would then sum them in float32.
+    assert optimized["exact"].dtype == np.float64
+    assert optimized["precise"].dtype == np.float64
+    # Text is object on pandas 2 and "str" on pandas 3; both must convert.
+    assert isinstance(optimized["city"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(optimized["day"])
+    assert not isinstance(optimized["free"].dtype, pd.CategoricalDtype)
+    assert optimized.attrs["memory_after"] < optimized.attrs["memory_before"]
+
+    pd.testing.assert_frame_equal(optimized[["small", "exact", "precise"]], df[["small", "exact", "precise"]], check_dtype=False)
+    assert optimized["city"].astype(object).equals(df["city"].astype(object))
+    assert (optimized["day"] == pd.to_datetime(df["day"])).all()
+
+
+@pytest.mark.parametrize("values, expected", [
+    # Read as 1 February in most of Europe and 2 January in the US
+    (["01/02/2024", "01/03/2024"], None),
+    (["01/02/2024", "31/01/2024"], ["2024-02-01", "2024-01-31"]),
+    (["01/02/2024", "01/31/2024"], ["2024-01-02", "2024-01-31"]),
+    (["05.05.2024", "06.06.2024"], ["2024-05-05", "2024-06-06"]),
+    (["2024-01-02", "2024-03-01 10:00"], ["2024-01-02", "2024-03-01 10:00"]),
+])
+def test_optimize_dtypes_parses_only_unambiguous_dates(values, expected):
+    column = optimize_dtypes(pd.DataFrame({"day": values * 10}))["day"]
+    if expected is None:
+        assert not pd.api.types.is_datetime64_any_dtype(column)
+        assert column.astype(object).tolist() == values * 10
+    else:
+        assert column.tolist() == pd.to_datetime(expected * 10, format="mixed").tolist()
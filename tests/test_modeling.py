@@ -0,0 +1,75 @@
+import io
+import pickle
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from modeling import ARTIFACT_MAGIC, export_model, import_model, score_frame, train_and_evaluate
+
+SECRET = b"test secret"
+
+
+@pytest.fixture
+def artifact():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 2)), columns=["x1", "x2"])
+    df["y"] = 3 * df["x1"] - df["x2"]
+    model, metrics = train_and_evaluate(df, ["x1", "x2"], "y", "Linear Regression")
+    data = export_model(model, ["x1", "x2"], "y", "Linear Regression", {}, metrics, SECRET)
+    return df, model, data
+
+
+def test_round_trip(artifact):
+    df, model, data = artifact
+    imported = import_model(data, SECRET)
+    assert imported["features"] == ["x1", "x2"]
+    assert imported["target"] == "y"
+    assert imported["model_choice"] == "Linear Regression"
+    np.testing.assert_allclose(imported["pipeline"].predict(df[["x1", "x2"]]), model.predict(df[["x1", "x2"]]))
+    scored = score_frame(imported, df)
+    assert list(scored.columns) == ["x1", "x2", "y", "y_predicted"]
+    # Imports accept any bytes-like upload buffer.
+    assert import_model(memoryview(data), SECRET)["target"] == "y"
+
+
+def test_rejects_tampered_payload(artifact):
+    _, _, data = artifact
+    tampered = bytearray(data)
+    tampered[-10] ^= 1
+    with pytest.raises(ValueError, match="signature"):
+        import_model(bytes(tampered), SECRET)
+
+
+def test_rejects_other_key(artifact):
+    _, _, data = artifact
+    with pytest.raises(ValueError, match="signature"):
+        import_model(data, b"another server")
+
+
+class Exploit:
+    loaded = False
+
+    def __reduce__(self):
+        return (setattr, (Exploit, "loaded", True))
+
+
+@pytest.mark.parametrize("forge", [
+    # A plain joblib file, as an attacker would upload
+    lambda payload: payload,
+    # The marker with a made-up signature
+    lambda payload: ARTIFACT_MAGIC + bytes(32) + payload,
+    # Too short to hold a signature
+    lambda payload: ARTIFACT_MAGIC + b"x",
+])
+def test_unsigned_files_are_never_unpickled(forge):
+    buffer = io.BytesIO()
+    joblib.dump({"pipeline": Exploit(), "features": []}, buffer)
+    with pytest.raises(ValueError):
+        import_model(forge(buffer.getvalue()), SECRET)
+    assert not Exploit.loaded
+    # The payload really would run on load.
+    pickle.loads(pickle.dumps(Exploit()))
+    assert Exploit.loaded
+    Exploit.loaded = False
@@ -0,0 +1,67 @@
+import threading
+import tracemalloc
+
+import numpy as np
+
+from profiling import PipelineProfiler
+
+MB = 1024 * 1024
+
+
+def allocate(megabytes):
+    block = np.ones(megabytes * MB // 8)
+    del block
+
+
+def peaks(profiler):
+    return {record["stage"]: record["peak_increase_bytes"] for record in profiler.records}
+
+
+def test_nested_stages_keep_their_own_peaks():
+    profiler = PipelineProfiler(trace_memory=True)
+    with profiler.stage("outer"):
+        allocate(40)
+        with profiler.stage("inner"):
+            allocate(4)
+        assert tracemalloc.is_tracing()
+    recorded = peaks(profiler)
+    assert 40 * MB <= recorded["outer"] < 44 * MB
+    assert 4 * MB <= recorded["inner"] < 8 * MB
+    assert not tracemalloc.is_tracing()
+
+
+def test_concurrent_stages_do_not_stop_each_other():
+    profiler = PipelineProfiler(trace_memory=True)
+    other = PipelineProfiler(trace_memory=True)
+    started, finished = threading.Event(), threading.Event()
+
+    def short_stage():
+        started.wait()
+        with other.stage("short"):
+            allocate(2)
+        finished.set()
+
+    thread = threading.Thread(target=short_stage)
+    thread.start()
+    with profiler.stage("long"):
+        allocate(30)
+        started.set()
+        finished.wait()
+        # The other session's stage ended; tracing must still be on for this one.
+        assert tracemalloc.is_tracing()
+        allocate(10)
+    thread.join()
+    # The 30 MB peak was reached before the other stage reset the peak.
+    assert 30 * MB <= peaks(profiler)["long"] < 34 * MB
+    assert 2 * MB <= peaks(other)["short"] < 6 * MB
+    assert not tracemalloc.is_tracing()
+
+
+def test_stages_without_tracing_record_rss_growth():
+    profiler = PipelineProfiler()
+    with profiler.stage("stage", rows=10) as info:
+        info["rows"] = 20
+    [record] = profiler.records
+    assert record["rows"] == 20
+    assert record["peak_increase_bytes"] is None or record["peak_increase_bytes"] >= 0
+    assert not tracemalloc.is_tracing()
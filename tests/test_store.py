@@ -0,0 +1,87 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from store import DatasetStore
+
+
+def frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "value": rng.normal(size=rows),
+        "count": rng.integers(0, 100, rows),
+        "label": pd.Categorical(rng.choice(["a", "b"], rows)),
+        "when": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows), unit="h"),
+    })
+
+
+def test_round_trip(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    df = frame(500)
+    df.attrs["memory_before"] = 12345
+    assert store.save("k", df, "book.xlsx / Sheet1")
+    assert "k" in store
+    loaded = store.load("k")
+    pd.testing.assert_frame_equal(loaded, df)
+    assert loaded.attrs["memory_before"] == 12345
+    [entry] = store.catalog()
+    assert (entry["key"], entry["name"], entry["rows"], entry["columns"]) == ("k", "book.xlsx / Sheet1", 500, 4)
+
+    # A second store on the same directory sees the dataset.
+    assert "k" in DatasetStore(str(tmp_path))
+
+
+def test_unstorable_frame_is_not_retried(tmp_path, monkeypatch):
+    store = DatasetStore(str(tmp_path))
+    mixed = pd.DataFrame({"mixed": pd.Series([1, "a", 2.5], dtype=object)})
+    calls = []
+    mkstemp = tempfile.mkstemp
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return mkstemp(*args, **kwargs)
+
+    monkeypatch.setattr("store.tempfile.mkstemp", counting)
+    assert not store.save("mixed", mixed, "mixed")
+    assert not store.save("mixed", mixed, "mixed")
+    assert len(calls) == 1
+    assert "mixed" not in store
+    assert store.catalog() == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_budget_evicts_least_recently_opened(tmp_path, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("store.time.time", lambda: next(clock))
+    probe = DatasetStore(str(tmp_path / "probe"))
+    probe.save("probe", frame(2000), "probe")
+    [entry] = probe.catalog()
+    store = DatasetStore(str(tmp_path / "store"), max_bytes=int(entry["bytes"] * 2.5))
+    for key in ("a", "b"):
+        assert store.save(key, frame(2000), key)
+    store.load("a")
+    # "b" is now the least recently opened and makes room for "c".
+    assert store.save("c", frame(2000), "c")
+    assert [entry["key"] for entry in store.catalog()] == ["c", "a"]
+    assert "b" not in store
+    assert sum(entry["bytes"] for entry in store.catalog()) <= store.max_bytes
+
+
+def test_dataset_larger_than_budget_is_kept(tmp_path):
+    store = DatasetStore(str(tmp_path), max_bytes=1)
+    assert store.save("a", frame(100), "a")
+    assert store.save("b", frame(100), "b")
+    # The newest dataset stays, however large; older ones are evicted.
+    assert [entry["key"] for entry in store.catalog()] == ["b"]
+
+
+def test_delete(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    store.save("a", frame(10), "a")
+    store.save("b", frame(10), "b")
+    store.delete("a")
+    assert "a" not in store
+    assert [entry["key"] for entry in store.catalog()] == ["b"]
+    # Deleting an unknown key is harmless.
+    store.delete("missing")
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from sampling import sample_rows
+
+# Rows handed to the Pygwalker component at most
+DEFAULT_ROW_BUDGET = 50_000
+
+AGGREGATIONS = ["mean", "sum", "median", "min", "max"]
+
+# Name of the group size column added to aggregated frames
+GROUP_SIZE_COLUMN = "row_count"
+
+
+def aggregate_frame(df, group_by, aggregation="mean"):
+    """Group ``df`` by ``group_by`` and aggregate every numeric column."""
+    numeric_columns = [column for column in df.select_dtypes(include=['number']).columns if column not in group_by]
+    grouped = df.groupby(group_by, observed=True, dropna=False, sort=False)
+    aggregated = grouped[numeric_columns].agg(aggregation) if numeric_columns else pd.DataFrame(index=grouped.size().index)
+    aggregated[GROUP_SIZE_COLUMN] = grouped.size()
+    return aggregated.reset_index()
+
+
+def prepare_visualization_frame(df, row_budget=DEFAULT_ROW_BUDGET, group_by=None, aggregation="mean"):
+    """Reduce ``df`` to what the browser-side explorer can handle.
+
+    With ``group_by`` the frame is pre-aggregated; either way a result
+    larger than ``row_budget`` is uniformly downsampled, so the serialized
+    HTML stays bounded regardless of the size of the dataset.
+    """
+    if group_by:
+        df = aggregate_frame(df, group_by, aggregation)
+    return sample_rows(df, row_budget)